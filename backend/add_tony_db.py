@@ -1,12 +1,11 @@
 # create_tony_user.py
-from app import app, db, User
-from werkzeug.security import generate_password_hash
+from app import app, db, User, upgrade_database
 import sys
 
 def create_tony_user(password):
     with app.app_context():
-        # Create the database tables
-        db.create_all()
+        # Create or migrate the database tables
+        upgrade_database()
 
         # Create or update the "tony" user
         tony_user = User.query.filter_by(username="tony").first()
@@ -18,7 +17,7 @@ def create_tony_user(password):
             print("User 'tony' already exists. Updating password.")
 
         # Set or update the password
-        tony_user.password_hash = generate_password_hash(password)
+        tony_user.set_password(password)
         db.session.commit()
 
         print("User 'tony' has been created or updated successfully.")
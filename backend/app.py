@@ -1,33 +1,158 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, has_request_context, make_response, request, jsonify, json, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
-from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import JWTManager, create_access_token, get_jwt, jwt_required, current_user
 from flask_cors import CORS
-from werkzeug.security import generate_password_hash, check_password_hash
-from sqlalchemy import func, UniqueConstraint
+from werkzeug.exceptions import HTTPException
+from werkzeug.test import EnvironBuilder
+from sqlalchemy import func, UniqueConstraint, and_, event, exists, literal_column, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import load_only
 import os
-from datetime import timedelta
-import random
-import requests
+import hashlib
+import threading
+from functools import wraps
+import sqlite3
+import re
+import csv
+import io
+import gzip
+import tempfile
+import click
+from flask.cli import AppGroup
+from datetime import datetime, timedelta, timezone
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
 from flask import request, jsonify
 import logging
+from deck import UnseenDeck
+from match_index import MatchIndex, bitmap
+from user_cache import UserCache
+from omdb import OmdbCache, OmdbClient, parse_query
+import migrations
+import movie_metadata
+from catalog_search import BM25_WEIGHTS, fts_query, normalize_title, title_similarity
+from metrics import RequestMetrics
+from response_cache import ResponseCache
+from passwords import PasswordHasher
+import snapshots
+from json_provider import FastJSONProvider
+from events import Event, EventBroker, EventLogRelay
+import recommender
+from recommender import SimilarityIndex
+import time
 
-logging.basicConfig(level=logging.DEBUG)
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'WARNING').upper())
 
 app = Flask(__name__)
-CORS(app, resources={r"/api/*": {"origins": ["http://localhost:3000", "http://127.0.0.1:3000", "http://192.168.7.38:3000"]}})
+app.json = FastJSONProvider(app)
+CORS(app, resources={r"/api/*": {"origins": ["http://localhost:3000", "http://127.0.0.1:3000", "http://192.168.7.38:3000"]}},
+     expose_headers=["X-Next-After", "ETag"])
 
 # Configuration
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///movie_matcher.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///movie_matcher.db')
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    # One connection per serving thread, plus headroom for bursts; SQLite
+    # connections are cheap, and WAL lets them read while another one writes
+    'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+    'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+    'pool_timeout': 30,
+    # The lock wait is set by the busy_timeout pragma below
+    'connect_args': {'check_same_thread': False},
+}
+# Applied to every new SQLite connection
+app.config['SQLITE_PRAGMAS'] = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 30000,  # milliseconds to wait on a locked database
+    'cache_size': -64000,  # KiB, i.e. 64 MB of page cache
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['JWT_SECRET_KEY'] = 'your-secret-key'  # Change this!
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=1)
+app.config['USER_CACHE_SIZE'] = 1024
+app.config['USER_CACHE_TTL'] = 300  # seconds
+app.config['SIMILARITY_INDEX_PATH'] = os.environ.get('SIMILARITY_INDEX_PATH', os.path.join(app.instance_path, 'similarity_index.npz'))
+app.config['RANKED_DECK_REFRESH'] = 25  # swipes between re-rankings of a user's ranked deck
+# Users whose decks stay in memory (per deck type); others are rebuilt on their next request
+app.config['DECK_CACHE_USERS'] = int(os.environ.get('DECK_CACHE_USERS', 256))
+app.config['RESPONSE_CACHE_BYTES'] = int(os.environ.get('RESPONSE_CACHE_BYTES', 64 * 1024 * 1024))
+# "memory" delivers /api/events within one process; "database" relays them
+# through the event_log table so every worker sees them
+app.config['EVENT_BROKER'] = os.environ.get('EVENT_BROKER', 'memory')
+app.config['EVENT_KEEPALIVE'] = 15  # seconds between keep-alive comments on idle streams
+app.config['EVENT_LOG_RETENTION'] = 3600  # seconds event_log rows are kept for replay
+app.config['BATCH_MAX_WORKERS'] = int(os.environ.get('BATCH_MAX_WORKERS', 4))  # threads running batched GETs
+# Users allowed to call /api/admin/* endpoints
+app.config['ADMIN_USERNAMES'] = {name.strip() for name in os.environ.get('ADMIN_USERNAMES', '').split(',') if name.strip()}
+# Where snapshot exports are staged; defaults to the system temp directory
+app.config['SNAPSHOT_TMP_DIR'] = os.environ.get('SNAPSHOT_TMP_DIR')
+# Processes hashing passwords; unset for one per CPU, 0 to hash in the request thread
+app.config['PASSWORD_HASH_WORKERS'] = int(os.environ['PASSWORD_HASH_WORKERS']) if os.environ.get('PASSWORD_HASH_WORKERS') else None
 
 OMDB_API_KEY = os.environ.get('OMDB_API_KEY')
+app.config['OMDB_BASE_URL'] = os.environ.get('OMDB_BASE_URL', 'http://www.omdbapi.com/')
+app.config['OMDB_CACHE_PATH'] = os.environ.get('OMDB_CACHE_PATH', os.path.join(app.instance_path, 'omdb_cache.db'))
+app.config['OMDB_CACHE_TTL'] = int(os.environ.get('OMDB_CACHE_TTL', 7 * 24 * 3600))
+app.config['OMDB_NEGATIVE_CACHE_TTL'] = int(os.environ.get('OMDB_NEGATIVE_CACHE_TTL', 24 * 3600))
+app.config['OMDB_MAX_WORKERS'] = int(os.environ.get('OMDB_MAX_WORKERS', 8))
 
+# Requests slower than this are logged with their queries; unset to disable
+app.config['SLOW_REQUEST_MS'] = float(os.environ['SLOW_REQUEST_MS']) if os.environ.get('SLOW_REQUEST_MS') else None
+app.config['METRICS_WINDOW'] = 1000  # recent requests per route kept for percentiles
+
+# Largest number of cards /api/movies/random?count=K hands out in one response
+MAX_PREFETCH = 20
+
+# OMDb record fields a movie can't be stored without
+OMDB_MOVIE_FIELDS = ('Title', 'Year', 'Poster', 'Plot', 'Genre', 'imdbRating', 'Runtime', 'Actors')
+
+# Largest page of /api/user/movie-history?limit=
+MAX_HISTORY_PAGE = 500
+
+# Largest number of swipes POST /api/movies/swipes accepts in one request
+MAX_SWIPE_BATCH = 500
+MAX_LOCAL_SEARCH = 50
+
+# Largest number of sub-requests POST /api/batch runs in one request
+MAX_BATCH_REQUESTS = 20
+
+# Distinct catalog filters whose matching movie ids are kept in memory
+FILTER_CACHE_SIZE = 64
+
+# Movies loaded per query when streaming /api/movies/all, and the largest ?limit= page
+CATALOG_BATCH_SIZE = 500
+
+
+# Environ key under which /api/batch hands sub-requests the (token, claims) it already verified.
+# Clients can't set it: request headers only ever become HTTP_* keys.
+BATCH_JWT_ENVIRON_KEY = 'movie_matcher.batch_jwt'
+
+class BatchJWTManager(JWTManager):
+    """JWTManager that skips re-verifying a token the enclosing batch request already verified."""
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        verified = request.environ.get(BATCH_JWT_ENVIRON_KEY) if has_request_context() else None
+        if verified is not None and verified[0] == encoded_token:
+            return dict(verified[1])
+        return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
 
 # Initialize extensions
 db = SQLAlchemy(app)
-jwt = JWTManager(app)
+jwt = BatchJWTManager(app)
+password_hasher = PasswordHasher(max_workers=app.config['PASSWORD_HASH_WORKERS'])
+
+@event.listens_for(Engine, 'connect')
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    for name, value in app.config['SQLITE_PRAGMAS'].items():
+        cursor.execute(f"PRAGMA {name} = {value}")
+    cursor.close()
 
 # Models
 class User(db.Model):
@@ -38,37 +163,629 @@ class User(db.Model):
     liked_movies = db.relationship('Movie', secondary='user_likes', lazy='dynamic')
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.check(self.password_hash, password)
 
 class Movie(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(120), nullable=False)
-    year = db.Column(db.Integer, nullable=False)  # Make sure year is not nullable
+    year = db.Column(db.Integer, nullable=False, index=True)  # Make sure year is not nullable
     poster = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=False)
     genre = db.Column(db.String(50), nullable=False)
     rating = db.Column(db.String(10), nullable=False)
     length = db.Column(db.String(20), nullable=False)
     starring = db.Column(db.String(200), nullable=False)
+    # Numeric copies of rating and length, for filtering and sorting
+    rating_value = db.Column(db.Float, index=True)
+    runtime_minutes = db.Column(db.Integer, index=True)
     added_by_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     added_by = db.relationship('User', backref=db.backref('added_movies', lazy='dynamic'))
 
     __table_args__ = (UniqueConstraint('title', 'year', name='_title_year_uc'),)
 
 
+class Genre(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50, collation='NOCASE'), unique=True, nullable=False)
+
+
+class Person(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(120, collation='NOCASE'), unique=True, nullable=False)
+
+
+# Genres and cast split out of Movie.genre / Movie.starring; the reverse
+# indexes serve "movies with genre X / actor Y" lookups
+movie_genre = db.Table('movie_genre',
+    db.Column('movie_id', db.Integer, db.ForeignKey('movie.id'), primary_key=True),
+    db.Column('genre_id', db.Integer, db.ForeignKey('genre.id'), primary_key=True),
+    db.Index('ix_movie_genre_genre_id_movie_id', 'genre_id', 'movie_id')
+)
+
+movie_cast = db.Table('movie_cast',
+    db.Column('movie_id', db.Integer, db.ForeignKey('movie.id'), primary_key=True),
+    db.Column('person_id', db.Integer, db.ForeignKey('person.id'), primary_key=True),
+    db.Index('ix_movie_cast_person_id_movie_id', 'person_id', 'movie_id')
+)
+
+
+class DataVersion(db.Model):
+    """A counter that write paths bump, so read endpoints can tell when their data changed.
+
+    Scopes are "users", "catalog", "swipes" and "user:<id>" for one user's swipes.
+    """
+    scope = db.Column(db.String(40), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+
+class EventLog(db.Model):
+    """Events for /api/events, shared between workers when EVENT_BROKER is "database"."""
+    id = db.Column(db.Integer, primary_key=True)
+    type = db.Column(db.String(40), nullable=False)
+    data = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, server_default=func.current_timestamp(), index=True)
+
+    # AUTOINCREMENT, so ids keep increasing after old rows are pruned
+    __table_args__ = {'sqlite_autoincrement': True}
+
+
 user_likes = db.Table('user_likes',
     db.Column('user_id', db.Integer, db.ForeignKey('user.id'), primary_key=True),
-    db.Column('movie_id', db.Integer, db.ForeignKey('movie.id'), primary_key=True)
+    db.Column('movie_id', db.Integer, db.ForeignKey('movie.id'), primary_key=True),
+    db.Index('ix_user_likes_movie_id_user_id', 'movie_id', 'user_id')
 )
 
 user_seen_movies = db.Table('user_seen_movies',
     db.Column('user_id', db.Integer, db.ForeignKey('user.id'), primary_key=True),
-    db.Column('movie_id', db.Integer, db.ForeignKey('movie.id'), primary_key=True)
+    db.Column('movie_id', db.Integer, db.ForeignKey('movie.id'), primary_key=True),
+    db.Column('seen_at', db.DateTime, server_default=func.current_timestamp()),  # NULL for swipes made before migration 3
+    db.Index('ix_user_seen_movies_movie_id_user_id', 'movie_id', 'user_id')
 )
 
+# Request instrumentation
+request_metrics = RequestMetrics(window=app.config['METRICS_WINDOW'])
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info['query_start'].pop()) * 1000
+    if not has_request_context() or 'query_count' not in g:
+        return
+    g.query_count += 1
+    g.query_ms += elapsed_ms
+    if g.queries is not None:
+        g.queries.append({"sql": statement, "ms": round(elapsed_ms, 3)})
+
+@app.before_request
+def _start_request_metrics():
+    g.request_start = time.perf_counter()
+    g.query_count = 0
+    g.query_ms = 0.0
+    g.queries = [] if app.config['SLOW_REQUEST_MS'] is not None else None
+
+@app.after_request
+def _capture_response_metrics(response):
+    g.response_status = response.status_code
+    if not response.is_streamed:
+        g.response_bytes = response.calculate_content_length()
+        return response
+
+    # Streamed bodies are produced after the view returns (and teardown may
+    # run more than once around them), so record once the body is closed
+    state = g._get_current_object()
+    state.response_bytes = 0
+    state.metrics_deferred = True
+    route = f"{request.method} {request.url_rule.rule}" if request.url_rule else None
+    path = request.full_path
+
+    def count_bytes(chunks):
+        for chunk in chunks:
+            state.response_bytes += len(chunk.encode() if isinstance(chunk, str) else chunk)
+            yield chunk
+
+    response.response = count_bytes(response.response)
+    response.call_on_close(lambda: _finish_request_metrics(state, route, path, None))
+    return response
+
+@app.teardown_request
+def _record_request_metrics(exc):
+    if 'request_start' not in g or g.get('metrics_deferred') or request.url_rule is None:
+        return
+    _finish_request_metrics(g, f"{request.method} {request.url_rule.rule}", request.full_path, exc)
+
+def _finish_request_metrics(state, route, path, exc):
+    if route is None:
+        return
+    latency_ms = (time.perf_counter() - state.request_start) * 1000
+    status = 500 if exc is not None else state.get('response_status', 500)
+    request_metrics.record(route, status, latency_ms, state.query_count, state.query_ms, state.get('response_bytes'))
+
+    slow_ms = app.config['SLOW_REQUEST_MS']
+    if slow_ms is not None and latency_ms >= slow_ms:
+        logging.warning("Slow request: %s %.1f ms, %d queries", route, latency_ms, state.query_count)
+        request_metrics.record_slow({
+            "route": route,
+            "path": path,
+            "status": status,
+            "latency_ms": round(latency_ms, 3),
+            "queries": state.queries,
+        })
+
+def upgrade_database():
+    """Bring the database schema up to date; returns the migrations applied."""
+    return migrations.upgrade(db.engine, db.metadata)
+
+# OMDb lookups
+_omdb_client = None
+
+def get_omdb_client():
+    global _omdb_client
+    if _omdb_client is None:
+        os.makedirs(os.path.dirname(app.config['OMDB_CACHE_PATH']) or '.', exist_ok=True)
+        cache = OmdbCache(
+            app.config['OMDB_CACHE_PATH'],
+            ttl=app.config['OMDB_CACHE_TTL'],
+            negative_ttl=app.config['OMDB_NEGATIVE_CACHE_TTL']
+        )
+        _omdb_client = OmdbClient(
+            OMDB_API_KEY,
+            app.config['OMDB_BASE_URL'],
+            cache=cache,
+            max_workers=app.config['OMDB_MAX_WORKERS']
+        )
+    return _omdb_client
+
+# Movie serialization
+# Movie columns a response can be narrowed to with ?fields=
+MOVIE_FIELDS = {
+    column.key: column
+    for column in (Movie.id, Movie.title, Movie.year, Movie.poster, Movie.description, Movie.genre,
+                   Movie.rating, Movie.length, Movie.starring, Movie.rating_value, Movie.runtime_minutes)
+}
+DECK_FIELDS = ('id', 'title', 'year', 'poster', 'description', 'genre', 'rating', 'length', 'starring')
+
+def _requested_fields(default, extra=()):
+    """Return the fields a movie response should include: ?fields= (or "fields" in a POST body), else `default`.
+
+    `extra` lists the endpoint's computed fields (like match_count) that can
+    be asked for alongside Movie columns. "id" is always included. Raises
+    ValueError for unknown names.
+    """
+    value = request.args.get('fields')
+    if value is None and request.method == 'POST':
+        data = request.get_json(silent=True)
+        value = data.get('fields') if isinstance(data, dict) else None
+    if value is None:
+        return default
+    names = value.split(',') if isinstance(value, str) else value
+    if not isinstance(names, list):
+        raise ValueError("fields must be a comma-separated string or a list")
+    names = [str(name).strip() for name in names if str(name).strip()]
+    unknown = [name for name in names if name not in MOVIE_FIELDS and name not in extra]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return tuple(dict.fromkeys(['id'] + names))
+
+def _movie_columns(fields):
+    """Query option that loads only the Movie columns among `fields`."""
+    return load_only(*[MOVIE_FIELDS[field] for field in fields if field in MOVIE_FIELDS])
+
+def _movie_to_dict(movie, fields=DECK_FIELDS):
+    return {field: getattr(movie, field) for field in fields if field in MOVIE_FIELDS}
+
+# Catalog filters
+def _movie_filters(params):
+    """Build Movie conditions from genre/actor/yearFrom/yearTo/minRating/maxRuntime parameters.
+
+    `genre` and `actor` take comma-separated names (or a list, in JSON bodies)
+    and a movie must have all of them; each resolves through the movie_genre /
+    movie_cast reverse indexes. Raises ValueError for malformed numbers.
+    """
+    conditions = []
+    for key, model, link_table, link_column in (
+        ('genre', Genre, movie_genre, movie_genre.c.genre_id),
+        ('actor', Person, movie_cast, movie_cast.c.person_id),
+    ):
+        value = params.get(key)
+        if isinstance(value, list):
+            value = ','.join(str(name) for name in value)
+        for name in movie_metadata.split_names(value):
+            conditions.append(Movie.id.in_(
+                select(link_table.c.movie_id).join(model, model.id == link_column).where(model.name == name)
+            ))
+
+    for key, convert, condition in (
+        ('yearFrom', int, lambda value: Movie.year >= value),
+        ('yearTo', int, lambda value: Movie.year <= value),
+        ('minRating', float, lambda value: Movie.rating_value >= value),
+        ('maxRuntime', int, lambda value: Movie.runtime_minutes <= value),
+    ):
+        value = params.get(key)
+        if value is None or value == '':
+            continue
+        try:
+            conditions.append(condition(convert(value)))
+        except (TypeError, ValueError):
+            raise ValueError(f"{key} must be a number")
+    return conditions
+
+def _filter_params():
+    """Filter parameters come from the query string, or the JSON body of a POST."""
+    if request.method == 'GET':
+        return request.args
+    data = request.get_json(silent=True)
+    return data if isinstance(data, dict) else {}
+
+def _int_arg(name, default=None):
+    """Read an integer query parameter; raises ValueError if it's present but not an integer."""
+    value = request.args.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
+
+# (filter SQL, catalog version) -> (movie id frozenset, bitmap), most recently used last
+_filter_cache = OrderedDict()
+_filter_cache_lock = threading.Lock()
+
+def _filtered_movies(filters):
+    """Return (ids, bitmap) of the movies matching `filters`.
+
+    Results are cached per catalog version, so swiping through a filtered
+    deck or re-polling filtered matches doesn't rescan the catalog.
+    """
+    condition = str(and_(*filters).compile(compile_kwargs={"literal_binds": True}))
+    key = (condition, _read_versions(('catalog',)))
+    with _filter_cache_lock:
+        cached = _filter_cache.get(key)
+        if cached is not None:
+            _filter_cache.move_to_end(key)
+            return cached
+    ids = frozenset(db.session.scalars(select(Movie.id).where(*filters)))
+    result = (ids, bitmap(ids))
+    with _filter_cache_lock:
+        _filter_cache[key] = result
+        while len(_filter_cache) > FILTER_CACHE_SIZE:
+            _filter_cache.popitem(last=False)
+    return result
+
+# Unseen-movie decks
+unseen_deck = UnseenDeck(max_users=app.config['DECK_CACHE_USERS'])
+ranked_deck = UnseenDeck(max_users=app.config['DECK_CACHE_USERS'])
+
+def _extend_deck(deck, user_id):
+    """Shuffle movies added since the deck was built into it."""
+    new_ids = db.session.query(Movie.id).filter(Movie.id > deck.high_water(user_id)).all()
+    new_ids = [movie_id for (movie_id,) in new_ids]
+    if new_ids:
+        deck.extend(user_id, new_ids, max(new_ids))
+
+def _refresh_deck(user_id):
+    """Build the user's deck on first use and shuffle in movies added since."""
+    if not unseen_deck.has(user_id):
+        high_water = db.session.query(func.max(Movie.id)).scalar() or 0
+        already_seen = exists().where(
+            user_seen_movies.c.user_id == user_id,
+            user_seen_movies.c.movie_id == Movie.id
+        )
+        unseen_ids = db.session.query(Movie.id).filter(Movie.id <= high_water, ~already_seen).all()
+        unseen_deck.load(user_id, [movie_id for (movie_id,) in unseen_ids], high_water)
+        return
+    _extend_deck(unseen_deck, user_id)
+
+def _refresh_ranked_deck(user_id):
+    """Re-rank the user's deck on first use and every RANKED_DECK_REFRESH swipes.
+
+    Between re-rankings cards are served from the precomputed order, so the
+    O(users x movies) scoring pass is amortized over many cards.
+    """
+    if ranked_deck.has(user_id) and ranked_deck.discarded(user_id) < app.config['RANKED_DECK_REFRESH']:
+        _extend_deck(ranked_deck, user_id)
+        return
+    index = _sync_similarity_index()
+    high_water = db.session.query(func.max(Movie.id)).scalar() or 0
+    ranked_deck.load(user_id, index.ranked_unseen(user_id, high_water), high_water, shuffle=False)
+
+def _next_unseen_movies(user_id, count, ranked=False, filters=(), fields=DECK_FIELDS):
+    """Return the next `count` unseen movies from the top of the user's deck.
+
+    Candidates are re-checked against user_seen_movies in the same query that
+    loads them, so swipes recorded by another worker never resurface a card.
+    With `filters`, cards that don't match are skipped over but kept in the
+    deck for later unfiltered requests.
+    """
+    deck, refresh = (ranked_deck, _refresh_ranked_deck) if ranked else (unseen_deck, _refresh_deck)
+    refresh(user_id)
+    allowed = _filtered_movies(filters)[0] if filters else None
+    while True:
+        candidate_ids = deck.peek(user_id, count, allowed)
+        if not candidate_ids:
+            if deck.has(user_id):
+                return []
+            # Evicted by other users' decks since the refresh above
+            refresh(user_id)
+            continue
+
+        rows = db.session.query(Movie, user_seen_movies.c.user_id) \
+            .options(_movie_columns(fields)) \
+            .outerjoin(user_seen_movies, and_(
+                user_seen_movies.c.movie_id == Movie.id,
+                user_seen_movies.c.user_id == user_id
+            )) \
+            .filter(Movie.id.in_(candidate_ids)) \
+            .all()
+
+        movies = {movie.id: movie for movie, seen_by in rows if seen_by is None}
+        stale_ids = [movie_id for movie_id in candidate_ids if movie_id not in movies]
+        if not stale_ids:
+            return [movies[movie_id] for movie_id in candidate_ids]
+        deck.discard(user_id, stale_ids)
+
+# Collaborative-filtering index for ranked decks
+_similarity_index = None
+_similarity_index_lock = threading.Lock()
+
+def _load_similarity_index():
+    """Build a SimilarityIndex from the saved snapshot, or from scratch if there is none."""
+    path = app.config['SIMILARITY_INDEX_PATH']
+    if os.path.exists(path):
+        return SimilarityIndex.from_snapshot(path)
+    index = SimilarityIndex()
+    _rebuild_similarity_index(index)
+    return index
+
+def _rebuild_similarity_index(index):
+    likes = db.session.execute(text("SELECT rowid, user_id, movie_id FROM user_likes ORDER BY rowid")).all()
+    seen = db.session.execute(text("SELECT rowid, user_id, movie_id FROM user_seen_movies ORDER BY rowid")).all()
+    index.load(
+        [(user_id, movie_id) for _, user_id, movie_id in likes],
+        [(user_id, movie_id) for _, user_id, movie_id in seen],
+        likes[-1][0] if likes else 0,
+        seen[-1][0] if seen else 0
+    )
+
+def _sync_similarity_index():
+    """Return the similarity index, folding in swipes other workers recorded since the last sync."""
+    global _similarity_index
+    with _similarity_index_lock:
+        if _similarity_index is None:
+            _similarity_index = _load_similarity_index()
+    index = _similarity_index
+
+    seen = db.session.execute(
+        text("SELECT rowid, user_id, movie_id FROM user_seen_movies WHERE rowid > :high_water ORDER BY rowid"),
+        {"high_water": index.seen_high_water}
+    ).all()
+    if seen:
+        index.add_seen([(user_id, movie_id) for _, user_id, movie_id in seen], seen[-1][0])
+    likes = db.session.execute(
+        text("SELECT rowid, user_id, movie_id FROM user_likes WHERE rowid > :high_water ORDER BY rowid"),
+        {"high_water": index.likes_high_water}
+    ).all()
+    if likes:
+        index.add_likes([(user_id, movie_id) for _, user_id, movie_id in likes], likes[-1][0])
+    return index
+
+# Group match index
+match_index = MatchIndex()
+
+def _sync_match_index():
+    """Fold likes recorded since the last sync (by any worker) into the match index."""
+    rows = db.session.execute(
+        text("SELECT rowid, user_id, movie_id FROM user_likes WHERE rowid > :high_water ORDER BY rowid"),
+        {"high_water": match_index.high_water}
+    ).all()
+    if not rows:
+        return
+    likes = [(user_id, movie_id) for _, user_id, movie_id in rows]
+    if match_index.high_water == 0:
+        match_index.load(likes, rows[-1][0])
+    else:
+        match_index.add_likes(likes, rows[-1][0])
+
+# Current-user loading
+user_cache = UserCache(maxsize=app.config['USER_CACHE_SIZE'], ttl=app.config['USER_CACHE_TTL'])
+
+@jwt.user_lookup_loader
+def _load_current_user(jwt_header, jwt_data):
+    """Resolve `current_user` from the token's uid claim, hitting the database only on a cache miss."""
+    user_id = jwt_data.get('uid')
+    if user_id is not None:
+        cached = user_cache.get(user_id)
+        if cached is not None:
+            return cached
+        user = db.session.get(User, user_id)
+    else:
+        # Tokens issued before the uid claim existed only carry the username
+        user = User.query.filter_by(username=jwt_data['sub']).first()
+    return user_cache.put(user) if user else None
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_cached_user(mapper, connection, target):
+    user_cache.invalidate(target.id)
+
+def _load_users(user_ids):
+    """Return {user_id: UserRef} for the given ids, querying only the ones not cached."""
+    users, missing = user_cache.get_many(user_ids)
+    if missing:
+        users.update(user_cache.preload(User.query.filter(User.id.in_(missing)).all()))
+    return users
+
+# Per-user interaction views
+def _seen_movie_ids(user_id):
+    """Return the ids of every movie the user has swiped on, read in one query."""
+    return frozenset(db.session.scalars(
+        select(user_seen_movies.c.movie_id).where(user_seen_movies.c.user_id == user_id)
+    ))
+
+def _interaction_history(user_id, after=0, since=None, limit=None):
+    """Return (seq, movie id, title, seen_at, liked) rows in swipe order.
+
+    `seq` is the user_seen_movies rowid, which only grows, so it doubles as
+    the pagination cursor for `after`.
+    """
+    seq = literal_column('user_seen_movies.rowid')
+    query = db.session.query(
+        seq, Movie.id, Movie.title, user_seen_movies.c.seen_at, user_likes.c.movie_id.isnot(None)
+    ).select_from(user_seen_movies) \
+        .join(Movie, Movie.id == user_seen_movies.c.movie_id) \
+        .outerjoin(user_likes, and_(
+            user_likes.c.user_id == user_seen_movies.c.user_id,
+            user_likes.c.movie_id == user_seen_movies.c.movie_id
+        )) \
+        .filter(user_seen_movies.c.user_id == user_id, seq > after)
+    if since is not None:
+        query = query.filter(user_seen_movies.c.seen_at >= since)
+    query = query.order_by(seq)
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
+
+# Data versions and response caching
+response_cache = ResponseCache(max_bytes=app.config['RESPONSE_CACHE_BYTES'])
+
+def _bump_versions(*scopes):
+    """Bump data versions inside the caller's transaction; the caller commits."""
+    table = DataVersion.__table__
+    stmt = sqlite_insert(table).values([{"scope": scope, "version": 1} for scope in scopes])
+    db.session.execute(stmt.on_conflict_do_update(
+        index_elements=[table.c.scope],
+        set_={"version": table.c.version + 1}
+    ))
+
+def _read_versions(scopes):
+    versions = dict(db.session.query(DataVersion.scope, DataVersion.version).filter(DataVersion.scope.in_(scopes)))
+    return tuple(versions.get(scope, 0) for scope in scopes)
+
+def versioned_response(version_scopes):
+    """Serve a read endpoint with an ETag and from the response cache.
+
+    `version_scopes` returns the data-version scopes the response depends on
+    (or None to bypass caching). The ETag covers the endpoint, its parameters
+    and those versions, so it changes exactly when a write path bumps one of
+    them. Only 200s carry it, so GET requests with a matching If-None-Match
+    get a 304 only ever in place of a successful response.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            scopes = version_scopes()
+            if scopes is None:
+                return view(*args, **kwargs)
+
+            key = repr((request.endpoint, request.query_string, request.get_data(), scopes, _read_versions(scopes)))
+            etag = hashlib.sha1(key.encode()).hexdigest()
+            if request.method in ('GET', 'HEAD') and request.if_none_match.contains(etag):
+                response = app.response_class(status=304)
+            else:
+                cached = response_cache.get(etag)
+                if cached is not None:
+                    body, mimetype = cached
+                    response = app.response_class(body, mimetype=mimetype)
+                else:
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    _store_response(etag, response)
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
+
+def _store_response(etag, response):
+    if not response.is_streamed:
+        response_cache.set(etag, response.get_data(), response.mimetype)
+        return
+
+    # Keep a copy of a streamed body as it goes out; it's cached only if the
+    # client reads it to the end
+    chunks = response.response
+    mimetype = response.mimetype
+
+    def tee():
+        body = []
+        for chunk in chunks:
+            body.append(chunk.encode() if isinstance(chunk, str) else chunk)
+            yield chunk
+        response_cache.set(etag, b''.join(body), mimetype)
+
+    response.response = tee()
+
+# Live events
+event_broker = EventBroker()
+_event_relay = None
+_event_relay_lock = threading.Lock()
+
+def _queue_event(event_type, data):
+    """Publish an event for /api/events once the current transaction commits.
+
+    With the database broker the event_log row is written in the same
+    transaction, so other workers see exactly the committed events.
+    """
+    if app.config['EVENT_BROKER'] == 'database':
+        db.session.execute(EventLog.__table__.insert().values(type=event_type, data=json.dumps(data)))
+    db.session.info.setdefault('pending_events', []).append((event_type, data))
+
+@event.listens_for(db.session, 'after_commit')
+def _publish_pending_events(session):
+    pending = session.info.pop('pending_events', None)
+    if not pending:
+        return
+    if app.config['EVENT_BROKER'] == 'database':
+        if _event_relay is not None:
+            _event_relay.notify()
+        return
+    for event_type, data in pending:
+        event_broker.publish(event_type, data)
+
+@event.listens_for(db.session, 'after_rollback')
+def _drop_pending_events(session):
+    session.info.pop('pending_events', None)
+
+def _event_source():
+    """The broker /api/events subscribes to, with the event_log relay running if it's in use."""
+    global _event_relay
+    if app.config['EVENT_BROKER'] == 'database' and _event_relay is None:
+        with _event_relay_lock:
+            if _event_relay is None:
+                relay = EventLogRelay(db.engine, event_broker, retention=app.config['EVENT_LOG_RETENTION'])
+                relay.start()
+                _event_relay = relay
+    return event_broker
+
+def _sse(event):
+    # Events without an id leave the client's Last-Event-ID where it was
+    event_id = f"id: {event.id}\n" if event.id is not None else ""
+    return f"{event_id}event: {event.type}\ndata: {json.dumps(event.data)}\n\n"
+
+def _group_match(group, movie_id):
+    """Return the match event payload if every user in `group` now likes the movie, else None."""
+    _sync_match_index()
+    if len(match_index.likers(movie_id, group)) < len(group):
+        return None
+    movie = db.session.get(Movie, movie_id)
+    if movie is None:
+        return None
+    users = _load_users(group)
+    return {
+        "user_ids": group,
+        "movie": dict(
+            _movie_to_dict(movie, ('id', 'title', 'poster', 'genre', 'rating')),
+            match_count=len(group),
+            matched_users=[{"id": users[user_id].id, "username": users[user_id].username} for user_id in group if user_id in users]
+        )
+    }
+
 # Routes
 @app.route('/')
 def home():
@@ -121,6 +838,7 @@ def register():
     new_user = User(username=username)
     new_user.set_password(password)
     db.session.add(new_user)
+    _bump_versions('users')
     db.session.commit()
 
     return jsonify({"message": "User created successfully"}), 201
@@ -134,165 +852,375 @@ def login():
 
     user = User.query.filter_by(username=username).first()
     if user and user.check_password(password):
-        access_token = create_access_token(identity=username)
+        access_token = create_access_token(identity=username, additional_claims={"uid": user.id})
         return jsonify(access_token=access_token), 200
     else:
         return jsonify({"message": "Invalid username or password"}), 401
 
-import logging
-import random
-
 @app.route('/api/movies/random', methods=['GET'])
 @jwt_required()
 def get_random_movie():
-    current_user = get_jwt_identity()
-    user = User.query.filter_by(username=current_user).first()
-    
-    logging.info(f"Fetching random movie for user: {current_user}")
-    
-    # Get all movie IDs
-    all_movie_ids = db.session.query(Movie.id).all()
-    all_movie_ids = [movie_id for (movie_id,) in all_movie_ids]
-    logging.info(f"Total movies in database: {len(all_movie_ids)}")
-    
-    # Get IDs of movies the user has already seen
-    seen_movie_ids = db.session.query(user_seen_movies.c.movie_id).filter(user_seen_movies.c.user_id == user.id).all()
-    seen_movie_ids = [movie_id for (movie_id,) in seen_movie_ids]
-    logging.info(f"Movies seen by user: {len(seen_movie_ids)}")
-    
-    # Find unseen movie IDs
-    unseen_movie_ids = list(set(all_movie_ids) - set(seen_movie_ids))
-    logging.info(f"Unseen movies: {len(unseen_movie_ids)}")
-    
-    if not unseen_movie_ids:
-        logging.info("No unseen movies found")
+    user = current_user
+
+    count = request.args.get('count')
+    if count is not None:
+        try:
+            count = int(count)
+        except ValueError:
+            return jsonify({"message": "count must be an integer"}), 400
+        if not 1 <= count <= MAX_PREFETCH:
+            return jsonify({"message": f"count must be between 1 and {MAX_PREFETCH}"}), 400
+
+    mode = request.args.get('mode', 'random')
+    if mode not in ('random', 'ranked'):
+        return jsonify({"message": "mode must be 'random' or 'ranked'"}), 400
+    if mode == 'ranked' and not recommender.available:
+        logging.warning("NumPy is not installed; serving a random deck instead of a ranked one")
+        mode = 'random'
+    try:
+        filters = _movie_filters(request.args)
+        fields = _requested_fields(DECK_FIELDS)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    movies = _next_unseen_movies(user.id, count or 1, ranked=mode == 'ranked', filters=filters, fields=fields)
+    if not movies:
+        logging.info("No unseen movies left for user: %s", user.username)
+        if filters:
+            return jsonify({"message": "No more unseen movies match the filters"}), 404
         return jsonify({"message": "No more unseen movies"}), 404
-    
-    # Get a random unseen movie
-    random_movie_id = random.choice(unseen_movie_ids)
-    movie = Movie.query.get(random_movie_id)
-    
-    if not movie:
-        logging.error(f"Movie with id {random_movie_id} not found in database")
-        return jsonify({"message": "Error fetching movie", "error": "Movie not found in database"}), 500
-    
-    logging.info(f"Selected movie: {movie.title}")
-    
-    return jsonify({
-        "id": movie.id,
-        "title": movie.title,
-        "year": movie.year,
-        "poster": movie.poster,
-        "description": movie.description,
-        "genre": movie.genre,
-        "rating": movie.rating,
-        "length": movie.length,
-        "starring": movie.starring
-    }), 200
 
+    if count is None:
+        return jsonify(_movie_to_dict(movies[0], fields)), 200
+    return jsonify([_movie_to_dict(movie, fields) for movie in movies]), 200
 
-@app.route('/api/movies/like', methods=['POST'])
+
+def _apply_swipes(user_id, events):
+    """Record a batch of swipes for a user in one transaction.
+
+    Every swiped movie is marked as seen and liked ones are added to
+    user_likes, using INSERT OR IGNORE so repeated swipes are harmless (we
+    don't store dislikes). Swipes that changed anything are published as
+    "swipe" events. Returns the ids of movies that don't exist.
+    """
+    movie_ids = {event['movieId'] for event in events}
+    known_ids = {movie_id for (movie_id,) in db.session.query(Movie.id).filter(Movie.id.in_(movie_ids))}
+
+    seen = list(dict.fromkeys(event['movieId'] for event in events if event['movieId'] in known_ids))
+    liked = list(dict.fromkeys(event['movieId'] for event in events if event['liked'] and event['movieId'] in known_ids))
+    new_seen = new_likes = set()
+    if seen:
+        seen_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        new_seen = set(db.session.execute(
+            sqlite_insert(user_seen_movies).on_conflict_do_nothing().returning(user_seen_movies.c.movie_id),
+            [{"user_id": user_id, "movie_id": movie_id, "seen_at": seen_at} for movie_id in seen]
+        ).scalars())
+    if liked:
+        new_likes = set(db.session.execute(
+            sqlite_insert(user_likes).on_conflict_do_nothing().returning(user_likes.c.movie_id),
+            [{"user_id": user_id, "movie_id": movie_id} for movie_id in liked]
+        ).scalars())
+    if seen:
+        _bump_versions('swipes', f'user:{user_id}')
+    for movie_id in seen:
+        if movie_id in new_seen or movie_id in new_likes:
+            _queue_event('swipe', {"user_id": user_id, "movie_id": movie_id, "liked": movie_id in new_likes})
+    db.session.commit()
+
+    unseen_deck.discard(user_id, seen)
+    ranked_deck.discard(user_id, seen)
+    match_index.add_likes([(user_id, movie_id) for movie_id in liked])
+    if _similarity_index is not None:
+        _similarity_index.add_seen([(user_id, movie_id) for movie_id in seen])
+        _similarity_index.add_likes([(user_id, movie_id) for movie_id in liked])
+    return sorted(movie_ids - known_ids)
+
+def _parse_swipes(data):
+    """Validate a list of {"movieId": int, "liked": bool} events."""
+    if not isinstance(data, list) or not data:
+        raise ValueError("Provide a non-empty list of swipes")
+    if len(data) > MAX_SWIPE_BATCH:
+        raise ValueError(f"At most {MAX_SWIPE_BATCH} swipes can be sent at once")
+    events = []
+    for event in data:
+        if not isinstance(event, dict) or type(event.get('movieId')) is not int or not isinstance(event.get('liked'), bool):
+            raise ValueError("Each swipe needs an integer movieId and a boolean liked")
+        events.append({"movieId": event['movieId'], "liked": event['liked']})
+    return events
+
+@app.route('/api/movies/swipes', methods=['POST'])
 @jwt_required()
-def like_movie():
-    current_user = get_jwt_identity()
-    user = User.query.filter_by(username=current_user).first()
+def record_swipes():
+    user = current_user
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('swipes')
+
+    try:
+        events = _parse_swipes(data)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    unknown_ids = _apply_swipes(user.id, events)
+    return jsonify({
+        "message": "Swipes recorded successfully",
+        "recorded": sum(1 for event in events if event['movieId'] not in unknown_ids),
+        "unknown_movie_ids": unknown_ids
+    }), 200
+
+def _single_swipe(liked):
+    user = current_user
     data = request.get_json()
     movie_id = data.get('movieId')
 
-    movie = Movie.query.get(movie_id)
-    if not movie:
+    if type(movie_id) is not int or _apply_swipes(user.id, [{"movieId": movie_id, "liked": liked}]):
         return jsonify({"message": "Movie not found"}), 404
+    return None
 
-    if movie not in user.liked_movies:
-        user.liked_movies.append(movie)
-    
-    # Mark the movie as seen
-    if movie not in user.seen_movies:
-        user.seen_movies.append(movie)
-    
-    db.session.commit()
-
+@app.route('/api/movies/like', methods=['POST'])
+@jwt_required()
+def like_movie():
+    error = _single_swipe(liked=True)
+    if error:
+        return error
     return jsonify({"message": "Movie liked and marked as seen successfully"}), 200
 
 @app.route('/api/movies/dislike', methods=['POST'])
 @jwt_required()
 def dislike_movie():
-    current_user = get_jwt_identity()
-    user = User.query.filter_by(username=current_user).first()
-    data = request.get_json()
-    movie_id = data.get('movieId')
+    error = _single_swipe(liked=False)
+    if error:
+        return error
+    return jsonify({"message": "Movie marked as seen successfully"}), 200
 
-    movie = Movie.query.get(movie_id)
-    if not movie:
-        return jsonify({"message": "Movie not found"}), 404
+def _match_params():
+    """Read userIds/minLikes/limit from the JSON body (POST) or query string (GET).
 
-    # Just mark the movie as seen (we don't store dislikes)
-    if movie not in user.seen_movies:
-        user.seen_movies.append(movie)
-    
-    db.session.commit()
+    Raises ValueError if any of them isn't an integer.
+    """
+    if request.method == 'GET':
+        user_ids = [user_id for user_id in request.args.get('userIds', '').split(',') if user_id]
+        min_likes = request.args.get('minLikes')
+        limit = request.args.get('limit')
+    else:
+        data = request.get_json(silent=True) or {}
+        user_ids = data.get('userIds', [])
+        min_likes = data.get('minLikes')
+        limit = data.get('limit')
+    try:
+        user_ids = list(dict.fromkeys(int(user_id) for user_id in user_ids))
+        min_likes = int(min_likes) if min_likes is not None else None
+        limit = int(limit) if limit is not None else None
+    except (TypeError, ValueError):
+        raise ValueError("userIds, minLikes and limit must be integers")
+    return user_ids, min_likes, limit
 
-    return jsonify({"message": "Movie marked as seen successfully"}), 200
+def _match_version_scopes():
+    try:
+        user_ids, _, _ = _match_params()
+    except ValueError:
+        return None
+    return ['catalog'] + [f'user:{user_id}' for user_id in sorted(user_ids)]
+
+MATCH_FIELDS = ('id', 'title', 'poster', 'description', 'genre', 'rating', 'length', 'starring',
+                'match_count', 'matched_users')
 
-@app.route('/api/movies/matches', methods=['POST'])
+@app.route('/api/movies/matches', methods=['GET', 'POST'])
 @jwt_required()
+@versioned_response(_match_version_scopes)
 def get_matches():
-    current_user = get_jwt_identity()
-    user = User.query.filter_by(username=current_user).first()
+    user = current_user
     
-    logging.info(f"Fetching matches for user: {current_user}")
-    
-    if not user:
-        logging.warning(f"User not found: {current_user}")
-        return jsonify({"error": "User not found"}), 404
-    
-    data = request.get_json()
-    selected_user_ids = data.get('userIds', [])
+    logging.info("Fetching matches for user: %s", user.username)
     
+    try:
+        selected_user_ids, min_likes, limit = _match_params()
+        filters = _movie_filters(_filter_params())
+        fields = _requested_fields(MATCH_FIELDS, extra=('match_count', 'matched_users'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     if len(selected_user_ids) < 2:
         return jsonify({"error": "Please select at least two users to compare matches"}), 400
-    
+
+    if min_likes is not None and not 1 <= min_likes <= len(selected_user_ids):
+        return jsonify({"error": "minLikes must be between 1 and the number of selected users"}), 400
+    if limit is not None and limit < 1:
+        return jsonify({"error": "limit must be a positive integer"}), 400
+
     try:
-        # Find movies liked by all selected users
-        matched_movies = (
-            db.session.query(Movie)
-            .join(user_likes)
-            .filter(user_likes.c.user_id.in_(selected_user_ids))
-            .group_by(Movie.id)
-            .having(func.count(func.distinct(user_likes.c.user_id)) == len(selected_user_ids))
-            .all()
-        )
-        
+        _sync_match_index()
+        within = _filtered_movies(filters)[1] if filters else None
+
+        if min_likes is None:
+            # Movies liked by all selected users
+            ranked = [(movie_id, len(selected_user_ids)) for movie_id in match_index.full_matches(selected_user_ids, within)]
+            if limit is not None:
+                ranked = ranked[:limit]
+        else:
+            # Movies liked by at least min_likes of the selected users, best first
+            ranked = match_index.ranked_matches(selected_user_ids, min_likes, limit, within)
+
+        users = _load_users(selected_user_ids)
+        movie_ids = [movie_id for movie_id, _ in ranked]
+        movies = {
+            movie.id: movie
+            for movie in Movie.query.options(_movie_columns(fields)).filter(Movie.id.in_(movie_ids))
+        } if movie_ids else {}
+
         result = []
-        for movie in matched_movies:
-            # Get all selected users who liked this movie
-            matched_users = (
-                User.query
-                .join(user_likes)
-                .filter(user_likes.c.movie_id == movie.id)
-                .filter(User.id.in_(selected_user_ids))
-                .all()
-            )
-            
-            result.append({
-                "id": movie.id,
-                "title": movie.title,
-                "poster": movie.poster,
-                "description": movie.description,
-                "genre": movie.genre,
-                "rating": movie.rating,
-                "length": movie.length,
-                "starring": movie.starring,
-                "match_count": len(matched_users),
-                "matched_users": [{"id": u.id, "username": u.username} for u in matched_users]
-            })
+        for movie_id, _ in ranked:
+            movie = movies.get(movie_id)
+            if not movie:
+                continue
+            matched_users = [users[user_id] for user_id in match_index.likers(movie_id, selected_user_ids) if user_id in users]
+
+            item = _movie_to_dict(movie, fields)
+            if 'match_count' in fields:
+                item["match_count"] = len(matched_users)
+            if 'matched_users' in fields:
+                item["matched_users"] = [{"id": u.id, "username": u.username} for u in matched_users]
+            result.append(item)
         
-        logging.info(f"Matches found: {len(result)}")
+        logging.info("Matches found: %d", len(result))
         return jsonify(result), 200  # This will return an empty list if no matches are found
     except Exception as e:
-        logging.error(f"Error fetching matches: {str(e)}")
+        logging.error("Error fetching matches: %s", e)
         return jsonify({"error": "An error occurred while fetching matches"}), 500
 
+# Local catalog search
+_FTS_SEARCH = text(
+    "SELECT rowid FROM movie_fts WHERE movie_fts MATCH :match "
+    f"ORDER BY bm25(movie_fts, {', '.join(str(w) for w in BM25_WEIGHTS)}) LIMIT :limit"
+)
+
+def _fts_movie_ids(match, limit):
+    if match is None:
+        return []
+    return db.session.execute(_FTS_SEARCH, {"match": match, "limit": limit}).scalars().all()
+
+def _local_search(q, limit):
+    """Search the catalog by title, cast, genre and plot; returns (movie, exact) pairs.
+
+    Movies matching every word come first, in bm25 order. If that leaves
+    room, movies sharing a word stem with the query are added when their
+    title is close enough to it, which catches typos and misremembered titles.
+    Exact (normalized) title matches always sort to the top.
+    """
+    strict_ids = _fts_movie_ids(fts_query(q), limit)
+    loose_ids = []
+    if len(strict_ids) < limit:
+        seen = set(strict_ids)
+        loose_ids = [movie_id for movie_id in _fts_movie_ids(fts_query(q, fuzzy=True), limit * 5)
+                     if movie_id not in seen]
+    ids = strict_ids + loose_ids
+    if not ids:
+        return []
+    movies = {movie.id: movie for movie in Movie.query.filter(Movie.id.in_(ids))}
+
+    wanted = normalize_title(q)
+    ranked = []
+    for position, movie_id in enumerate(strict_ids):
+        movie = movies[movie_id]
+        exact = normalize_title(movie.title) == wanted
+        ranked.append((not exact, 0, position, movie, exact))
+    for movie_id in loose_ids:
+        movie = movies[movie_id]
+        exact = normalize_title(movie.title) == wanted
+        similarity = title_similarity(q, movie.title)
+        if exact or similarity >= 0.6:
+            ranked.append((not exact, 1, -similarity, movie, exact))
+    ranked.sort(key=lambda item: item[:3])
+    return [(movie, exact) for _, _, _, movie, exact in ranked[:limit]]
+
+def _find_catalog_duplicates(wanted):
+    """Match (title, year) pairs against the catalog by normalized title (and year, unless None).
+
+    Returns the matching Movie or None for each pair. Candidates come from
+    one FTS lookup per title and are loaded together in a few IN queries.
+    """
+    candidates = [_fts_movie_ids(fts_query(title, column='title'), 20) for title, _ in wanted]
+    ids = list({movie_id for movie_ids in candidates for movie_id in movie_ids})
+    movies = {}
+    for start in range(0, len(ids), CATALOG_BATCH_SIZE):
+        chunk = ids[start:start + CATALOG_BATCH_SIZE]
+        movies.update((movie.id, movie) for movie in Movie.query.filter(Movie.id.in_(chunk)))
+
+    matches = []
+    for (title, year), movie_ids in zip(wanted, candidates):
+        normalized = normalize_title(title)
+        matches.append(next((
+            movies[movie_id] for movie_id in movie_ids
+            if normalize_title(movies[movie_id].title) == normalized and (year is None or movies[movie_id].year == year)
+        ), None))
+    return matches
+
+def _catalog_movie_as_omdb(movie, query):
+    """Shape a catalog movie like an OMDb search result so the client can show both."""
+    return {
+        "Title": movie.title,
+        "Year": str(movie.year),
+        "Poster": movie.poster,
+        "Plot": movie.description,
+        "Genre": movie.genre,
+        "imdbRating": movie.rating,
+        "Runtime": movie.length,
+        "Actors": movie.starring,
+        "Response": "True",
+        "InCatalog": True,
+        "catalogId": movie.id,
+        "query": query,
+    }
+
+@app.route('/api/movies/local-search', methods=['GET'])
+@jwt_required()
+def local_search():
+    q = request.args.get('q', '').strip()
+    if not q:
+        return jsonify({"error": "No search query provided"}), 400
+    limit = min(max(request.args.get('limit', 10, type=int), 1), MAX_LOCAL_SEARCH)
+    try:
+        fields = _requested_fields(DECK_FIELDS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    results = [dict(_movie_to_dict(movie, fields), exact=exact) for movie, exact in _local_search(q, limit)]
+    return jsonify(results), 200
+
+def _lookup_titles(titles):
+    """Look up "Title (1999)" queries, answering from the catalog before asking OMDb.
+
+    Every result carries InCatalog (and catalogId when true), including OMDb
+    results for movies the catalog already has under a different spelling.
+    """
+    results = [None] * len(titles)
+    remote = []
+    wanted = []
+    for title, year in map(parse_query, titles):
+        wanted.append((title, int(year) if year else None))
+    for i, (query, movie) in enumerate(zip(titles, _find_catalog_duplicates(wanted))):
+        if movie is not None:
+            results[i] = _catalog_movie_as_omdb(movie, query)
+        else:
+            remote.append(i)
+    if not remote:
+        return results
+
+    found = []
+    for i, result in zip(remote, get_omdb_client().lookup_many([titles[i] for i in remote])):
+        result['InCatalog'] = False
+        results[i] = result
+        if result.get('Response') == 'True' and result.get('Title'):
+            found.append(result)
+    wanted = []
+    for result in found:
+        year = str(result.get('Year', ''))[:4]
+        wanted.append((result['Title'], int(year) if year.isdigit() else None))
+    for result, movie in zip(found, _find_catalog_duplicates(wanted)):
+        if movie is not None:
+            result.update(InCatalog=True, catalogId=movie.id)
+    return results
+
 @app.route('/api/movies/search', methods=['GET'])
 @jwt_required()
 def search_movie():
@@ -303,19 +1231,103 @@ def search_movie():
     # Split the query into individual movie titles
     movie_titles = [title.strip() for title in query.split(';') if title.strip()]
 
-    results = []
-    for title in movie_titles:
-        response = requests.get(f"http://www.omdbapi.com/?apikey={OMDB_API_KEY}&t={title}")
-        if response.status_code == 200:
-            movie_data = response.json()
-            if movie_data.get('Response') == 'True':
-                results.append(movie_data)
+    # Results come back in input order; titles OMDb couldn't find keep its
+    # {"Response": "False", "Error": ...} shape so the client can show them
+    results = _lookup_titles(movie_titles)
 
-    if not results:
-        return jsonify({"error": "No movies found"}), 404
+    if not any(result.get('Response') == 'True' for result in results):
+        return jsonify({"error": "No movies found", "results": results}), 404
 
     return jsonify(results), 200
 
+def _movie_row_from_omdb(data, user_id):
+    """Map an OMDb record onto Movie columns; raises ValueError if it can't be stored."""
+    if not isinstance(data, dict):
+        raise ValueError("Record must be an object")
+    if data.get('Response') == 'False':
+        # An OMDb lookup that came back empty
+        raise ValueError(data.get('Error') or "Movie not found")
+    missing = [field for field in OMDB_MOVIE_FIELDS if not data.get(field)]
+    if missing:
+        raise ValueError(f"Missing fields: {', '.join(missing)}")
+    year = str(data['Year'])[:4]
+    if not year.isdigit():
+        raise ValueError(f"Invalid year: {data['Year']}")
+
+    return {
+        "title": data['Title'],
+        "poster": data['Poster'],
+        "description": data['Plot'],
+        "genre": data['Genre'],
+        "rating": data['imdbRating'],
+        "length": data['Runtime'],
+        "starring": data['Actors'],
+        "rating_value": movie_metadata.parse_rating(data['imdbRating']),
+        "runtime_minutes": movie_metadata.parse_runtime(data['Runtime']),
+        "year": int(year),
+        "added_by_id": user_id
+    }
+
+def _import_movies(records, user_id):
+    """Insert OMDb records in a single transaction, skipping duplicates.
+
+    Returns one report per record, in input order, with a status of "added",
+    "skipped" (the title/year is already in the catalog or earlier in the
+    batch) or "failed" (the record couldn't be mapped onto a Movie).
+    """
+    reports = []
+    mapped = []
+    for data in records:
+        try:
+            mapped.append((_movie_row_from_omdb(data, user_id), None))
+        except ValueError as e:
+            title = data.get('Title') or data.get('query') if isinstance(data, dict) else None
+            mapped.append(({"title": title}, str(e)))
+    # One catalog check for the whole batch, consumed in order below
+    duplicates = iter(_find_catalog_duplicates([(row['title'], row['year']) for row, error in mapped if error is None]))
+
+    rows = {}
+    for row, error in mapped:
+        if error is not None:
+            reports.append({"title": row['title'], "year": None, "status": "failed", "error": error})
+            continue
+        existing = next(duplicates)
+        if existing is not None:
+            # Same movie under a different spelling, e.g. "Matrix, The"
+            reports.append({"title": row['title'], "year": row['year'], "status": "skipped", "id": existing.id})
+            continue
+        key = (row['title'], row['year'])
+        reports.append({"title": row['title'], "year": row['year'], "status": "skipped"})
+        rows.setdefault(key, row)
+
+    added = {}
+    if rows:
+        stmt = sqlite_insert(Movie.__table__).on_conflict_do_nothing().returning(
+            Movie.__table__.c.id, Movie.__table__.c.title, Movie.__table__.c.year
+        )
+        for movie_id, title, year in db.session.execute(stmt, list(rows.values())):
+            added[(title, year)] = movie_id
+        if added:
+            movie_metadata.link_movies(db.session, db.metadata, [
+                (movie_id, rows[key]['genre'], rows[key]['starring']) for key, movie_id in added.items()
+            ])
+            _bump_versions('catalog')
+            for (title, year), movie_id in added.items():
+                _queue_event('movie_added', {"id": movie_id, "title": title, "year": year, "added_by_id": user_id})
+        db.session.commit()
+
+    for report in reports:
+        movie_id = added.pop((report['title'], report['year']), None)
+        if movie_id is not None:
+            report.update(status="added", id=movie_id)
+    return reports
+
+def _import_summary(reports):
+    counts = {"added": 0, "skipped": 0, "failed": 0}
+    for report in reports:
+        counts[report['status']] += 1
+    return dict(counts, results=reports)
+
 # add_movie route
 @app.route('/api/movies/add', methods=['POST'])
 @jwt_required()
@@ -324,84 +1336,204 @@ def add_movie():
     if not data:
         return jsonify({"error": "No data provided"}), 400
 
-    current_user = get_jwt_identity()
-    user = User.query.filter_by(username=current_user).first()
-
-    new_movie = Movie(
-        title=data['Title'],
-        poster=data['Poster'],
-        description=data['Plot'],
-        genre=data['Genre'],
-        rating=data['imdbRating'],
-        length=data['Runtime'],
-        starring=data['Actors'],
-        year=int(data['Year']) if data.get('Year') else None,
-        added_by=user
-    )
+    user = current_user
 
-    db.session.add(new_movie)
-    db.session.commit()
+    report = _import_movies([data], user.id)[0]
+    if report['status'] == 'failed':
+        return jsonify({"error": report['error']}), 400
+    if report['status'] == 'skipped':
+        error = {"error": "Movie already exists"}
+        if 'id' in report:
+            error['id'] = report['id']
+        return jsonify(error), 409
+
+    return jsonify({"message": "Movie added successfully", "id": report['id']}), 201
 
-    return jsonify({"message": "Movie added successfully", "id": new_movie.id}), 201
+@app.route('/api/movies/add-bulk', methods=['POST'])
+@jwt_required()
+def add_movies_bulk():
+    data = request.get_json(silent=True)
+    if isinstance(data, dict) and 'titles' in data:
+        titles = [title.strip() for title in data['titles'] if isinstance(title, str) and title.strip()]
+        records = _lookup_titles(titles)
+    elif isinstance(data, dict):
+        records = data.get('records')
+    else:
+        records = data
+    if not isinstance(records, list) or not records:
+        return jsonify({"error": "Provide a list of OMDb records, {\"records\": [...]} or {\"titles\": [...]}"}), 400
+
+    user = current_user
+
+    reports = _import_movies(records, user.id)
+    return jsonify(_import_summary(reports)), 200
+
+CATALOG_FIELDS = DECK_FIELDS + ('likes_count', 'unseen_by', 'added_by')
+
+def _movie_summary_batches(after, limit, users, filters=(), fields=CATALOG_FIELDS):
+    """Yield lists of catalog entries in id order, starting after movie id `after`.
+
+    Like counts and seen-by rows are aggregated per batch of movie ids, so each
+    batch costs at most three queries no matter how many users or swipes
+    there are; the aggregates are skipped when `fields` leaves them out.
+    """
+    remaining = limit
+    while remaining is None or remaining > 0:
+        batch_size = CATALOG_BATCH_SIZE if remaining is None else min(remaining, CATALOG_BATCH_SIZE)
+        rows = db.session.query(Movie, User.id, User.username) \
+            .options(_movie_columns(fields)) \
+            .join(User, Movie.added_by_id == User.id) \
+            .filter(Movie.id > after, *filters) \
+            .order_by(Movie.id) \
+            .limit(batch_size) \
+            .all()
+        if not rows:
+            return
+
+        movie_ids = [movie.id for movie, _, _ in rows]
+        likes_counts = {}
+        if 'likes_count' in fields:
+            likes_counts = dict(
+                db.session.query(user_likes.c.movie_id, func.count())
+                .filter(user_likes.c.movie_id.in_(movie_ids))
+                .group_by(user_likes.c.movie_id)
+                .all()
+            )
+        seen_by = {}
+        if 'unseen_by' in fields:
+            for movie_id, user_id in db.session.query(user_seen_movies.c.movie_id, user_seen_movies.c.user_id) \
+                    .filter(user_seen_movies.c.movie_id.in_(movie_ids)):
+                seen_by.setdefault(movie_id, set()).add(user_id)
+
+        batch = []
+        for movie, added_by_id, added_by_username in rows:
+            item = _movie_to_dict(movie, fields)
+            if 'likes_count' in fields:
+                item["likes_count"] = likes_counts.get(movie.id, 0)
+            if 'unseen_by' in fields:
+                seen_user_ids = seen_by.get(movie.id, ())
+                item["unseen_by"] = [{"id": user_id, "username": username} for user_id, username in users if user_id not in seen_user_ids]
+            if 'added_by' in fields:
+                item["added_by"] = {
+                    "id": added_by_id,
+                    "username": added_by_username
+                }
+            batch.append(item)
+        yield batch
+
+        after = movie_ids[-1]
+        if remaining is not None:
+            remaining -= len(rows)
+        if len(rows) < batch_size:
+            return
+
+def _stream_json_array(batches):
+    yield '['
+    first = True
+    for batch in batches:
+        for item in batch:
+            yield ('' if first else ',') + json.dumps(item)
+            first = False
+    yield ']'
 
 @app.route('/api/movies/all', methods=['GET'])
 @jwt_required()
+@versioned_response(lambda: ['users', 'catalog', 'swipes'])
 def get_all_movies():
     try:
-        # Get all users
-        all_users = User.query.all()
-        all_user_ids = [user.id for user in all_users]
-
-        # Query to get all movies with their like counts, users who have seen them, and the user who added them
-        movies_data = db.session.query(
-            Movie,
-            func.count(user_likes.c.user_id).label('likes_count'),
-            func.group_concat(user_seen_movies.c.user_id).label('seen_by_users'),
-            User
-        ).select_from(Movie) \
-         .outerjoin(user_likes, Movie.id == user_likes.c.movie_id) \
-         .outerjoin(user_seen_movies, Movie.id == user_seen_movies.c.movie_id) \
-         .join(User, Movie.added_by_id == User.id) \
-         .group_by(Movie.id) \
-         .all()
+        after = _int_arg('after', 0)
+        limit = _int_arg('limit')
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if limit is not None and not 1 <= limit <= CATALOG_BATCH_SIZE:
+        return jsonify({"error": f"limit must be between 1 and {CATALOG_BATCH_SIZE}"}), 400
+    try:
+        filters = _movie_filters(request.args)
+        fields = _requested_fields(CATALOG_FIELDS, extra=('likes_count', 'unseen_by', 'added_by'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-        result = []
-        for movie, likes_count, seen_by_users, added_by_user in movies_data:
-            seen_user_ids = set(map(int, seen_by_users.split(','))) if seen_by_users else set()
-            unseen_user_ids = set(all_user_ids) - seen_user_ids
-            unseen_users = User.query.filter(User.id.in_(unseen_user_ids)).all()
-
-            result.append({
-                "id": movie.id,
-                "title": movie.title,
-                "year": movie.year,
-                "poster": movie.poster,
-                "description": movie.description,
-                "genre": movie.genre,
-                "rating": movie.rating,
-                "length": movie.length,
-                "starring": movie.starring,
-                "likes_count": likes_count,
-                "unseen_by": [{"id": user.id, "username": user.username} for user in unseen_users],
-                "added_by": {
-                    "id": added_by_user.id,
-                    "username": added_by_user.username
-                }
-            })
+    try:
+        users = db.session.query(User.id, User.username).order_by(User.id).all()
+        user_cache.preload(users)
+
+        if limit is None:
+            # Whole catalog: stream it batch by batch instead of building one big list
+            batches = _movie_summary_batches(after, None, users, filters, fields)
+            return Response(stream_with_context(_stream_json_array(batches)), mimetype='application/json')
 
-        return jsonify(result), 200
+        page = [item for batch in _movie_summary_batches(after, limit + 1, users, filters, fields) for item in batch]
+        response = jsonify(page[:limit])
+        if len(page) > limit:
+            response.headers['X-Next-After'] = str(page[limit - 1]["id"])
+        return response, 200
     except Exception as e:
-        logging.error(f"Error fetching all movies: {str(e)}")
+        logging.error("Error fetching all movies: %s", e)
         return jsonify({"error": "An error occurred while fetching movies"}), 500
 
+@app.route('/api/events', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])  # EventSource can't send headers: ?jwt=<token>
+def stream_events():
+    """Server-sent events: "movie_added", "swipe", and "match" for the ?userIds= group.
+
+    A match event is sent when a like completes a movie every user in the
+    group likes. Clients resume after a reconnect with Last-Event-ID (or
+    ?lastEventId=), as far back as the broker's backlog goes.
+    """
+    try:
+        group = list(dict.fromkeys(int(user_id) for user_id in request.args.get('userIds', '').split(',') if user_id))
+    except ValueError:
+        return jsonify({"error": "userIds must be integers"}), 400
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({"error": "Last-Event-ID must be an integer"}), 400
+
+    broker = _event_source()
+    keepalive = app.config['EVENT_KEEPALIVE']
+    # Streams stay open for a long time; don't hold a connection between events
+    db.session.close()
+
+    def stream():
+        # Subscribed here, so a response that is closed without being read leaves nothing behind
+        subscription = broker.subscribe(last_event_id)
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                item = subscription.get(keepalive)
+                if item is None:
+                    if subscription.overflowed:
+                        return
+                    yield ": keepalive\n\n"
+                    continue
+                data = item.data
+                if len(group) > 1 and item.type == 'swipe' and data['liked'] and data['user_id'] in group:
+                    match = _group_match(group, data['movie_id'])
+                    db.session.close()
+                    # Matches are per stream, not in the backlog: send one before the swipe that
+                    # caused it, without an id, so a client that missed it replays the swipe
+                    if match:
+                        yield _sse(Event(None, 'match', match))
+                yield _sse(item)
+        finally:
+            broker.unsubscribe(subscription)
+
+    response = Response(stream_with_context(stream()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @app.route('/api/debug/movie-counts', methods=['GET'])
 @jwt_required()
 def debug_movie_counts():
-    current_user = get_jwt_identity()
-    user = User.query.filter_by(username=current_user).first()
-    
-    total_movies = Movie.query.count()
-    seen_movies = user.seen_movies.count()
+    user = current_user
+
+    total_movies, seen_movies = db.session.query(
+        db.session.query(func.count(Movie.id)).scalar_subquery(),
+        db.session.query(func.count()).select_from(user_seen_movies)
+            .filter(user_seen_movies.c.user_id == user.id).scalar_subquery()
+    ).one()
     
     return jsonify({
         "total_movies": total_movies,
@@ -409,19 +1541,29 @@ def debug_movie_counts():
         "unseen_movies": total_movies - seen_movies
     }), 200
 
+@app.route('/api/debug/metrics', methods=['GET'])
+@jwt_required()
+def debug_metrics():
+    return jsonify(dict(request_metrics.snapshot(), response_cache=response_cache.stats())), 200
+
+@app.route('/api/debug/metrics', methods=['DELETE'])
+@jwt_required()
+def reset_debug_metrics():
+    request_metrics.reset()
+    response_cache.reset_stats()
+    return jsonify({"message": "Metrics reset"}), 200
+
 @app.route('/api/debug/all-movies', methods=['GET'])
 @jwt_required()
 def get_all_movies_debug():
-    current_user = get_jwt_identity()
-    user = User.query.filter_by(username=current_user).first()
-    
-    all_movies = Movie.query.all()
+    seen_ids = _seen_movie_ids(current_user.id)
+
     result = []
-    for movie in all_movies:
+    for movie_id, title in db.session.query(Movie.id, Movie.title).order_by(Movie.id):
         result.append({
-            "id": movie.id,
-            "title": movie.title,
-            "seen": movie in user.seen_movies
+            "id": movie_id,
+            "title": title,
+            "seen": movie_id in seen_ids
         })
     
     return jsonify(result), 200
@@ -429,8 +1571,7 @@ def get_all_movies_debug():
 @app.route('/api/user/info', methods=['GET'])
 @jwt_required()
 def get_user_info():
-    current_user = get_jwt_identity()
-    user = User.query.filter_by(username=current_user).first()
+    user = current_user
     if user:
         return jsonify({"username": user.username}), 200
     else:
@@ -439,33 +1580,445 @@ def get_user_info():
 @app.route('/api/user/movie-history', methods=['GET'])
 @jwt_required()
 def get_movie_history():
-    current_user = get_jwt_identity()
-    user = User.query.filter_by(username=current_user).first()
-    if user:
-        seen_movies = user.seen_movies.all()
-        liked_movies = user.liked_movies.all()
-        
-        movie_history = []
-        for movie in seen_movies:
-            movie_history.append({
-                "title": movie.title,
-                "liked": movie in liked_movies
-            })
-        
-        return jsonify(movie_history), 200
-    else:
-        return jsonify({"error": "User not found"}), 404
+    user = current_user
+    try:
+        after = _int_arg('after', 0)
+        limit = _int_arg('limit')
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    since = request.args.get('since')
+    if limit is not None and not 1 <= limit <= MAX_HISTORY_PAGE:
+        return jsonify({"error": f"limit must be between 1 and {MAX_HISTORY_PAGE}"}), 400
+    if since:
+        try:
+            since = datetime.fromisoformat(since)
+        except ValueError:
+            return jsonify({"error": "since must be an ISO 8601 timestamp"}), 400
+        if since.tzinfo:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+
+    rows = _interaction_history(user.id, after=after, since=since, limit=limit + 1 if limit else None)
+
+    movie_history = []
+    for seq, movie_id, title, seen_at, liked in rows[:limit]:
+        movie_history.append({
+            "seq": seq,
+            "id": movie_id,
+            "title": title,
+            "liked": liked,
+            "seen_at": seen_at.isoformat() if seen_at else None
+        })
+
+    response = jsonify(movie_history)
+    if limit and len(rows) > limit:
+        response.headers['X-Next-After'] = str(movie_history[-1]["seq"])
+    return response, 200
     
 @app.route('/api/users', methods=['GET'])
 @jwt_required()
+@versioned_response(lambda: ['users'])
 def get_all_users():
     try:
         users = User.query.all()
+        user_cache.preload(users)
         return jsonify([{"id": user.id, "username": user.username} for user in users]), 200
     except Exception as e:
-        logging.error(f"Error fetching users: {str(e)}")
+        logging.error("Error fetching users: %s", e)
         return jsonify({"error": "An error occurred while fetching users"}), 500
 
+# Snapshots
+def admin_required(view):
+    """Like jwt_required, but the user must also be listed in ADMIN_USERNAMES."""
+    @wraps(view)
+    @jwt_required()
+    def wrapper(*args, **kwargs):
+        if current_user.username not in app.config['ADMIN_USERNAMES']:
+            return jsonify({"error": "Admin access required"}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+def _export_snapshot():
+    """Yield the database as NDJSON chunks, read from an online backup so writers aren't held up."""
+    fd, path = tempfile.mkstemp(suffix='.db', prefix='snapshot-', dir=app.config['SNAPSHOT_TMP_DIR'])
+    os.close(fd)
+    try:
+        connection = db.engine.raw_connection()
+        try:
+            snapshots.backup(connection.driver_connection, path)
+        finally:
+            connection.close()
+        yield from snapshots.iter_ndjson(path)
+    finally:
+        os.remove(path)
+
+@app.route('/api/admin/snapshot', methods=['GET'])
+@admin_required
+def export_snapshot():
+    """Stream users, the catalog and all swipes as an NDJSON snapshot for `flask db import`."""
+    chunks = _export_snapshot()
+    # Take the backup now, so errors surface as a 500 rather than a truncated stream
+    first = next(chunks)
+    db.session.close()
+
+    def stream():
+        yield first
+        yield from chunks
+
+    response = Response(stream(), mimetype='application/x-ndjson')
+    filename = f"movie-matcher-{datetime.now(timezone.utc):%Y%m%d-%H%M%S}.ndjson"
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+# Batched requests
+_batch_executor = ThreadPoolExecutor(max_workers=app.config['BATCH_MAX_WORKERS'], thread_name_prefix='batch')
+
+# Sub-request response headers passed back to the client
+BATCH_RESPONSE_HEADERS = ('ETag', 'X-Next-After')
+
+# Streaming endpoints, which would otherwise be buffered whole into the batch response
+UNBATCHABLE_ENDPOINTS = ('run_batch', 'stream_events', 'export_snapshot')
+
+def _batch_endpoint(method, path):
+    """Return the endpoint a sub-request routes to, or None if it doesn't route anywhere.
+
+    Matched the way dispatch will match it, i.e. on the percent-decoded path.
+    """
+    builder = EnvironBuilder(path=path, method=method)
+    try:
+        environ = builder.get_environ()
+    finally:
+        builder.close()
+    try:
+        endpoint, _ = app.url_map.bind_to_environ(environ).match()
+    except HTTPException:
+        # Left to dispatch, which answers with the usual 404/405
+        return None
+    return endpoint
+
+def _parse_batch(data):
+    """Validate a list of {"method", "path", "body", "headers"} sub-requests."""
+    if isinstance(data, dict):
+        data = data.get('requests')
+    if not isinstance(data, list) or not data:
+        raise ValueError("Provide a non-empty list of requests")
+    if len(data) > MAX_BATCH_REQUESTS:
+        raise ValueError(f"At most {MAX_BATCH_REQUESTS} requests can be batched at once")
+    specs = []
+    for item in data:
+        if not isinstance(item, dict) or not isinstance(item.get('path'), str):
+            raise ValueError("Each request needs a path")
+        route, query = urlsplit(item['path'])[2:4]
+        method = str(item.get('method', 'GET')).upper()
+        endpoint = _batch_endpoint(method, item['path'])
+        if not route.startswith('/api/') or endpoint in UNBATCHABLE_ENDPOINTS:
+            raise ValueError(f"{route} can't be batched")
+        if endpoint == 'get_all_movies' and 'limit' not in parse_qs(query):
+            # Without a limit the whole catalog is streamed
+            raise ValueError(f"{route} needs a ?limit= to be batched")
+        headers = item.get('headers') or {}
+        if not isinstance(headers, dict):
+            raise ValueError("headers must be an object")
+        specs.append({
+            "method": method,
+            "path": item['path'],
+            "body": item.get('body'),
+            "headers": {str(name): str(value) for name, value in headers.items() if name.lower() != 'authorization'},
+        })
+    return specs
+
+def _run_subrequest(spec, base_url, authorization, verified_jwt):
+    """Run one sub-request through routing, hooks and error handlers in its own app context.
+
+    `verified_jwt` is the batch request's (token, claims); the sub-request's
+    jwt_required reuses the claims instead of decoding the token again.
+    Returns (status, headers, mimetype, body bytes).
+    """
+    headers = dict(spec['headers'])
+    if authorization:
+        headers['Authorization'] = authorization
+    builder = EnvironBuilder(
+        path=spec['path'], base_url=base_url, method=spec['method'], headers=headers,
+        json=spec['body'] if spec['body'] is not None else None,
+        environ_overrides={BATCH_JWT_ENVIRON_KEY: verified_jwt}
+    )
+    try:
+        environ = builder.get_environ()
+    finally:
+        builder.close()
+
+    with app.app_context(), app.request_context(environ):
+        try:
+            response = app.full_dispatch_request()
+        except Exception:
+            logging.exception("Batched request %s %s failed", spec['method'], spec['path'])
+            response = jsonify({"error": "Internal server error"})
+            response.status_code = 500
+        try:
+            body = response.get_data()
+        finally:
+            response.close()
+    headers = {name: response.headers[name] for name in BATCH_RESPONSE_HEADERS if name in response.headers}
+    return response.status_code, headers, response.mimetype, body
+
+@app.route('/api/batch', methods=['POST'])
+@jwt_required()
+def run_batch():
+    """Run several API requests in one round trip; responses come back in request order.
+
+    The token is verified once, here; sub-requests carry the same
+    Authorization header and reuse the verified claims, and load the user
+    from the user cache. Consecutive GETs run in parallel; anything else
+    runs on its own, in order, so a read listed after a write sees the write.
+    """
+    try:
+        specs = _parse_batch(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    base_url = request.host_url
+    authorization = request.headers.get('Authorization')
+    verified_jwt = (authorization.split(None, 1)[-1], get_jwt()) if authorization else None
+    results = [None] * len(specs)
+    start = 0
+    while start < len(specs):
+        end = start
+        while end < len(specs) and specs[end]['method'] in ('GET', 'HEAD'):
+            end += 1
+        if end - start > 1:
+            futures = [_batch_executor.submit(_run_subrequest, specs[i], base_url, authorization, verified_jwt) for i in range(start, end)]
+            for i, future in zip(range(start, end), futures):
+                results[i] = future.result()
+        else:
+            end = start + 1
+            results[start] = _run_subrequest(specs[start], base_url, authorization, verified_jwt)
+        start = end
+
+    # Sub-request bodies are already JSON, so they're spliced in rather than re-encoded
+    parts = []
+    for status, headers, mimetype, body in results:
+        if not body:
+            payload = 'null'
+        elif mimetype == 'application/json':
+            payload = body.decode().strip()
+        else:
+            payload = json.dumps(body.decode(errors='replace'))
+        parts.append(f'{{"status":{status},"headers":{json.dumps(headers)},"body":{payload}}}')
+    return app.response_class('{"responses":[' + ','.join(parts) + ']}\n', mimetype='application/json'), 200
+
+# CLI commands
+db_cli = AppGroup('db', help="Manage the database schema and snapshots.")
+
+@db_cli.command('upgrade')
+def upgrade_database_command():
+    """Apply pending schema migrations."""
+    applied = upgrade_database()
+    for number, description in applied:
+        click.echo(f"Applied migration {number}: {description}")
+    click.echo(f"Database is at version {migrations.current_version(db.engine)}.")
+
+@db_cli.command('version')
+def database_version_command():
+    """Show the current schema version."""
+    click.echo(migrations.current_version(db.engine))
+
+def _open_snapshot(path, mode):
+    return gzip.open(path, mode + 't', encoding='utf-8') if path.endswith('.gz') else open(path, mode, encoding='utf-8')
+
+@db_cli.command('export')
+@click.argument('path', type=click.Path(dir_okay=False))
+def export_database_command(path):
+    """Write users, the catalog and all swipes to an NDJSON snapshot (gzipped if PATH ends in .gz).
+
+    Safe to run against a live database: it reads from an online backup.
+    """
+    with _open_snapshot(path, 'w') as f:
+        for chunk in _export_snapshot():
+            f.write(chunk)
+    click.echo(f"Exported snapshot to {path}.")
+
+@db_cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--batch-size', default=1000, show_default=True, help="Rows written per transaction.")
+def import_database_command(path, batch_size):
+    """Load an NDJSON snapshot made by `flask db export` or /api/admin/snapshot into an empty database.
+
+    Progress is saved to PATH.checkpoint after every batch, so rerunning an
+    interrupted import resumes it.
+    Restart running servers afterwards so their in-memory decks pick up
+    imported movies.
+    """
+    upgrade_database()
+    importer = snapshots.SnapshotImporter(db.engine, checkpoint_path=path + '.checkpoint', batch_size=batch_size)
+    with _open_snapshot(path, 'r') as f:
+        try:
+            inserted = importer.run(f)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+
+    _bump_versions('users', 'catalog', 'swipes')
+    db.session.commit()
+    for table, count in inserted.items():
+        click.echo(f"{count:>9}  {table}")
+    click.echo("Import complete.")
+
+app.cli.add_command(db_cli)
+
+movies_cli = AppGroup('movies', help="Manage the movie catalog.")
+
+@movies_cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--user', 'username', required=True, help="Username recorded as the movies' added_by.")
+def import_movies_command(path, username):
+    """Import movies from a JSON list of OMDb records or a title list file.
+
+    Title lists (like misc/top_movies.txt) are separated by semicolons, tabs or
+    newlines and are looked up on OMDb before importing.
+    """
+    user = User.query.filter_by(username=username).first()
+    if not user:
+        raise click.ClickException(f"User not found: {username}")
+
+    with open(path, encoding='utf-8') as f:
+        content = f.read()
+    try:
+        records = json.loads(content)
+    except ValueError:
+        titles = [title.strip() for title in re.split(r'[;\t\n]', content) if title.strip()]
+        click.echo(f"Looking up {len(titles)} titles on OMDb...")
+        records = _lookup_titles(titles)
+
+    summary = _import_summary(_import_movies(records, user.id))
+    for report in summary['results']:
+        line = f"{report['status']:>7}  {report['title']} ({report['year']})"
+        click.echo(line + (f": {report['error']}" if report.get('error') else ''))
+    click.echo(f"Added {summary['added']}, skipped {summary['skipped']}, failed {summary['failed']}.")
+
+app.cli.add_command(movies_cli)
+
+users_cli = AppGroup('users', help="Manage user accounts.")
+
+def _read_credentials(path):
+    """Read username/password pairs from a JSON list of objects or a CSV file with a header row.
+
+    Returns (reports, credentials): one report per record, in file order,
+    with status None for usable rows and "failed" otherwise, and a dict of
+    username -> password for the usable ones.
+    """
+    with open(path, encoding='utf-8', newline='') as f:
+        content = f.read()
+    try:
+        records = json.loads(content)
+    except ValueError:
+        records = list(csv.DictReader(io.StringIO(content)))
+    if not isinstance(records, list):
+        raise click.ClickException("Expected a JSON list or a CSV file with username and password columns")
+
+    reports = []
+    credentials = {}
+    for record in records:
+        record = record if isinstance(record, dict) else {}
+        username = record.get('username')
+        username = username.strip() if isinstance(username, str) else ''
+        password = record.get('password')
+        if not username or not isinstance(password, str) or not password:
+            error = "username and password are required"
+        elif len(username) > User.username.type.length:
+            error = f"username is longer than {User.username.type.length} characters"
+        elif username in credentials:
+            error = "duplicate username in file"
+        else:
+            error = None
+            credentials[username] = password
+        reports.append({"username": username or None, "status": "failed" if error else None, "error": error})
+    return reports, credentials
+
+def _echo_user_reports(reports):
+    for report in reports:
+        line = f"{report['status']:>14}  {report['username']}"
+        click.echo(line + (f": {report['error']}" if report.get('error') else ''))
+
+@users_cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--update/--no-update', default=True, help="Reset the password of users that already exist.")
+def import_users_command(path, update):
+    """Create users (or reset their passwords) from a CSV or JSON file.
+
+    Passwords are hashed on the process pool and every account is written
+    by one bulk upsert.
+    """
+    reports, credentials = _read_credentials(path)
+    existing = {username for (username,) in db.session.query(User.username).filter(User.username.in_(list(credentials)))}
+    for report in reports:
+        if report['status'] is None:
+            if report['username'] not in existing:
+                report['status'] = "created"
+            else:
+                report['status'] = "updated" if update else "skipped"
+
+    usernames = [username for username in credentials if update or username not in existing]
+    if usernames:
+        hashes = password_hasher.hash_many([credentials[username] for username in usernames])
+        table = User.__table__
+        stmt = sqlite_insert(table)
+        if update:
+            stmt = stmt.on_conflict_do_update(index_elements=[table.c.username], set_={"password_hash": stmt.excluded.password_hash})
+        else:
+            stmt = stmt.on_conflict_do_nothing()
+        db.session.execute(stmt, [
+            {"username": username, "password_hash": password_hash} for username, password_hash in zip(usernames, hashes)
+        ])
+        _bump_versions('users')
+        db.session.commit()
+
+    _echo_user_reports(reports)
+    counts = {status: sum(1 for report in reports if report['status'] == status)
+              for status in ("created", "updated", "skipped", "failed")}
+    click.echo(f"Created {counts['created']}, updated {counts['updated']}, skipped {counts['skipped']}, failed {counts['failed']}.")
+
+@users_cli.command('check')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+def check_users_command(path):
+    """Check that the users in a CSV or JSON file can log in with the passwords in it."""
+    reports, credentials = _read_credentials(path)
+    hashes = dict(db.session.query(User.username, User.password_hash).filter(User.username.in_(list(credentials))))
+    found = [username for username in credentials if username in hashes]
+    valid = dict(zip(found, password_hasher.check_many([(hashes[username], credentials[username]) for username in found])))
+    for report in reports:
+        if report['status'] is not None:
+            continue
+        if report['username'] not in valid:
+            report['status'] = "missing"
+        else:
+            report['status'] = "ok" if valid[report['username']] else "wrong password"
+
+    _echo_user_reports(reports)
+    failures = sum(1 for report in reports if report['status'] != "ok")
+    if failures:
+        raise click.ClickException(f"{failures} of {len(reports)} credentials failed")
+    click.echo(f"All {len(reports)} credentials are valid.")
+
+app.cli.add_command(users_cli)
+
+deck_cli = AppGroup('deck', help="Manage swipe decks.")
+
+@deck_cli.command('rebuild-index')
+def rebuild_similarity_index_command():
+    """Rebuild the collaborative-filtering index from scratch and save a snapshot.
+
+    Running servers pick the snapshot up on their next start and then catch
+    up incrementally from the swipes recorded after it.
+    """
+    if not recommender.available:
+        raise click.ClickException("NumPy is required to build the similarity index")
+    index = SimilarityIndex()
+    _rebuild_similarity_index(index)
+    path = app.config['SIMILARITY_INDEX_PATH']
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    index.save(path)
+    click.echo(f"Saved similarity index for {index.user_count} users to {path}")
+
+app.cli.add_command(deck_cli)
+
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
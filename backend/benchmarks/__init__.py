@@ -0,0 +1,7 @@
+"""Offline benchmarks for the Movie Matcher API.
+
+Run from the backend directory:
+
+    python -m benchmarks.run --scale medium --save benchmarks/baseline.json
+    python -m benchmarks.run --scale medium --compare benchmarks/baseline.json
+"""
@@ -0,0 +1,79 @@
+import random
+
+from werkzeug.security import generate_password_hash
+
+import movie_metadata
+
+GENRES = ['Action', 'Adventure', 'Comedy', 'Crime', 'Drama', 'Fantasy', 'Horror', 'Romance', 'Sci-Fi', 'Thriller']
+WORDS = ['Night', 'City', 'Last', 'Dream', 'River', 'Ghost', 'Summer', 'Empire', 'Silent', 'Road',
+         'Blue', 'Iron', 'Star', 'Secret', 'Wild', 'Lost', 'Golden', 'Dark', 'Little', 'House']
+BATCH_SIZE = 10000
+
+# Cheap hash so seeding dozens of users doesn't dominate the run
+PASSWORD_METHOD = 'pbkdf2:sha256:1000'
+PASSWORD = 'benchmark'
+
+
+def _batches(rows, size=BATCH_SIZE):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def generate(app_module, users, movies, swipes, like_rate=0.3, seed=0):
+    """Fill an empty database with synthetic users, movies and swipes.
+
+    Each user swipes on roughly `swipes / users` distinct movies. Movies get
+    a per-title appeal drawn from a beta distribution, so likes cluster on
+    popular titles the way real group data does. Returns a summary dict.
+    """
+    rng = random.Random(seed)
+    db = app_module.db
+    per_user = min(movies, swipes // max(users, 1))
+
+    with app_module.app.app_context():
+        app_module.upgrade_database()
+
+        password_hash = generate_password_hash(PASSWORD, method=PASSWORD_METHOD)
+        db.session.execute(app_module.User.__table__.insert(), [
+            {"id": i, "username": f"user{i}", "password_hash": password_hash} for i in range(1, users + 1)
+        ])
+
+        movie_rows = []
+        for i in range(1, movies + 1):
+            title = ' '.join(rng.sample(WORDS, rng.randint(1, 3)))
+            rating = round(rng.uniform(2, 9.5), 1)
+            runtime = rng.randint(75, 180)
+            movie_rows.append({
+                "id": i,
+                "title": f"{title} {i}",
+                "year": rng.randint(1950, 2024),
+                "poster": f"https://example.com/posters/{i}.jpg",
+                "description": f"Synthetic plot number {i}. " * rng.randint(3, 12),
+                "genre": ', '.join(rng.sample(GENRES, rng.randint(1, 3))),
+                "rating": f"{rating:.1f}",
+                "rating_value": rating,
+                "length": f"{runtime} min",
+                "runtime_minutes": runtime,
+                "starring": ', '.join(f"Actor {rng.randint(1, movies // 4 + 1)}" for _ in range(3)),
+                "added_by_id": rng.randint(1, users),
+            })
+        for batch in _batches(movie_rows):
+            db.session.execute(app_module.Movie.__table__.insert(), batch)
+            movie_metadata.link_movies(db.session, db.metadata, [
+                (row["id"], row["genre"], row["starring"]) for row in batch
+            ])
+
+        appeal = [rng.betavariate(2, 2 / like_rate - 2) for _ in range(movies + 1)]
+        seen_count = like_count = 0
+        for user_id in range(1, users + 1):
+            seen = rng.sample(range(1, movies + 1), per_user)
+            liked = [movie_id for movie_id in seen if rng.random() < appeal[movie_id]]
+            for batch in _batches([{"user_id": user_id, "movie_id": movie_id} for movie_id in seen]):
+                db.session.execute(app_module.user_seen_movies.insert(), batch)
+            for batch in _batches([{"user_id": user_id, "movie_id": movie_id} for movie_id in liked]):
+                db.session.execute(app_module.user_likes.insert(), batch)
+            seen_count += len(seen)
+            like_count += len(liked)
+        db.session.commit()
+
+    return {"users": users, "movies": movies, "swipes": seen_count, "likes": like_count}
@@ -0,0 +1,41 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class _OmdbStubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        params = parse_qs(urlparse(self.path).query)
+        title = params.get('t', [''])[0]
+        if not title or title.lower().startswith('missing'):
+            payload = {"Response": "False", "Error": "Movie not found!"}
+        else:
+            payload = {
+                "Response": "True",
+                "Title": title.title(),
+                "Year": params.get('y', ['2000'])[0],
+                "Poster": "https://example.com/poster.jpg",
+                "Plot": f"A synthetic plot for {title}.",
+                "Genre": "Drama",
+                "imdbRating": "7.0",
+                "Runtime": "100 min",
+                "Actors": "Jane Doe, John Roe",
+                "imdbID": f"tt{abs(hash(title)) % 10 ** 7:07d}",
+            }
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_omdb_stub():
+    """Serve OMDb-shaped responses on a free local port; returns (server, base_url)."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _OmdbStubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
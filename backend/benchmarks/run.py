@@ -0,0 +1,231 @@
+"""Drive the API through the Flask test client against a synthetic database.
+
+Everything runs offline: the database is a throwaway SQLite file and OMDb is
+replaced by a local stub server. Results can be saved as a JSON baseline and
+later runs compared against it; the exit status is 1 when any endpoint
+regresses by more than --threshold.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from urllib.parse import urlencode
+
+from benchmarks.datagen import GENRES, generate
+from benchmarks.omdb_stub import start_omdb_stub
+
+SCALES = {
+    # users, movies, swipes
+    'small': (10, 2000, 10000),
+    'medium': (30, 10000, 150000),
+    'large': (50, 50000, 1000000),
+}
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _scenarios(args, users):
+    """Yield (name, route, request factory) for each benchmarked endpoint."""
+    def random_movie(rng):
+        return 'GET', '/api/movies/random', rng.randint(1, users), None
+
+    def filtered_random_movie(rng):
+        query = urlencode({"genre": rng.choice(GENRES), "minRating": 6})
+        return 'GET', f'/api/movies/random?{query}', rng.randint(1, users), None
+
+    def like(rng):
+        return 'POST', '/api/movies/like', rng.randint(1, users), {"movieId": rng.randint(1, args.movies)}
+
+    def matches(rng):
+        user_ids = rng.sample(range(1, users + 1), min(args.group_size, users))
+        return 'POST', '/api/movies/matches', user_ids[0], {"userIds": user_ids}
+
+    def ranked_matches(rng):
+        user_ids = rng.sample(range(1, users + 1), min(args.group_size, users))
+        body = {"userIds": user_ids, "minLikes": max(1, len(user_ids) // 2), "limit": 50}
+        return 'POST', '/api/movies/matches', user_ids[0], body
+
+    def all_movies_page(rng):
+        after = rng.randint(0, max(args.movies - args.page_size, 0))
+        return 'GET', f'/api/movies/all?after={after}&limit={args.page_size}', rng.randint(1, users), None
+
+    def all_movies_page_fields(rng):
+        after = rng.randint(0, max(args.movies - args.page_size, 0))
+        query = urlencode({"after": after, "limit": args.page_size, "fields": "title,year,genre,rating,added_by,unseen_by"})
+        return 'GET', f'/api/movies/all?{query}', rng.randint(1, users), None
+
+    def movie_history(rng):
+        return 'GET', '/api/user/movie-history', rng.randint(1, users), None
+
+    def search(rng):
+        titles = ' ; '.join(f"Title {rng.randint(1, 50)}" for _ in range(5))
+        return 'GET', f'/api/movies/search?{urlencode({"query": titles})}', rng.randint(1, users), None
+
+    yield 'random', 'GET /api/movies/random', random_movie
+    yield 'random_filtered', 'GET /api/movies/random', filtered_random_movie
+    yield 'like', 'POST /api/movies/like', like
+    yield 'matches', 'POST /api/movies/matches', matches
+    yield 'matches_ranked', 'POST /api/movies/matches', ranked_matches
+    yield 'all_page', 'GET /api/movies/all', all_movies_page
+    yield 'all_page_fields', 'GET /api/movies/all', all_movies_page_fields
+    yield 'movie_history', 'GET /api/user/movie-history', movie_history
+    yield 'search', 'GET /api/movies/search', search
+
+
+def run_benchmarks(app_module, args, users):
+    from flask_jwt_extended import create_access_token
+
+    with app_module.app.app_context():
+        tokens = {
+            user.id: create_access_token(identity=user.username, additional_claims={"uid": user.id})
+            for user in app_module.User.query.all()
+        }
+    client = app_module.app.test_client()
+    rng = random.Random(args.seed)
+    results = {}
+
+    for name, route, make_request in _scenarios(args, users):
+        if args.only and name not in args.only:
+            continue
+        app_module.request_metrics.reset()
+        latencies = []
+        errors = 0
+        started = time.perf_counter()
+        for i in range(args.warmup + args.requests):
+            method, path, user_id, body = make_request(rng)
+            headers = {"Authorization": f"Bearer {tokens[user_id]}"}
+            t0 = time.perf_counter()
+            response = client.open(path, method=method, json=body, headers=headers)
+            response.get_data()
+            response.close()
+            elapsed_ms = (time.perf_counter() - t0) * 1000
+            if response.status_code >= 500:
+                errors += 1
+            if i == args.warmup - 1:
+                started = time.perf_counter()
+            if i >= args.warmup:
+                latencies.append(elapsed_ms)
+        duration = time.perf_counter() - started
+
+        stats = app_module.request_metrics.snapshot()['routes'].get(route, {})
+        latencies.sort()
+        results[name] = {
+            "requests": len(latencies),
+            "errors": errors,
+            "throughput_rps": round(len(latencies) / duration, 2) if duration else None,
+            "latency_ms": {
+                "p50": round(_percentile(latencies, 0.50), 3),
+                "p95": round(_percentile(latencies, 0.95), 3),
+                "p99": round(_percentile(latencies, 0.99), 3),
+            },
+            "queries_mean": stats.get('queries', {}).get('mean'),
+            "response_bytes_mean": stats.get('response_bytes', {}).get('mean'),
+        }
+        print(f"{name:>15}: {results[name]['throughput_rps']:>9} req/s  "
+              f"p50 {results[name]['latency_ms']['p50']:>8} ms  p95 {results[name]['latency_ms']['p95']:>8} ms  "
+              f"queries {results[name]['queries_mean']}")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return a list of human-readable regressions against a baseline run."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous:
+            continue
+        if current['latency_ms']['p95'] > previous['latency_ms']['p95'] * (1 + threshold):
+            regressions.append(f"{name}: p95 {previous['latency_ms']['p95']} -> {current['latency_ms']['p95']} ms")
+        if previous['throughput_rps'] and current['throughput_rps'] < previous['throughput_rps'] * (1 - threshold):
+            regressions.append(f"{name}: throughput {previous['throughput_rps']} -> {current['throughput_rps']} req/s")
+        if previous['queries_mean'] is not None and current['queries_mean'] is not None \
+                and current['queries_mean'] > previous['queries_mean']:
+            regressions.append(f"{name}: queries {previous['queries_mean']} -> {current['queries_mean']} per request")
+        if current['errors'] > previous['errors']:
+            regressions.append(f"{name}: errors {previous['errors']} -> {current['errors']}")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('--users', type=int, help="Override the scale's user count")
+    parser.add_argument('--movies', type=int, help="Override the scale's movie count")
+    parser.add_argument('--swipes', type=int, help="Override the scale's swipe count")
+    parser.add_argument('--requests', type=int, default=200, help="Measured requests per endpoint")
+    parser.add_argument('--warmup', type=int, default=20, help="Unmeasured requests per endpoint")
+    parser.add_argument('--group-size', type=int, default=6, help="Users per matches request")
+    parser.add_argument('--page-size', type=int, default=100, help="Movies per /api/movies/all page")
+    parser.add_argument('--only', nargs='+', help="Run only these scenarios")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--db', help="SQLite file to use; generated if missing and kept afterwards")
+    parser.add_argument('--save', help="Write results to this JSON file")
+    parser.add_argument('--compare', help="Baseline JSON file to compare against")
+    parser.add_argument('--threshold', type=float, default=0.25, help="Allowed relative regression")
+    args = parser.parse_args(argv)
+
+    users, movies, swipes = SCALES[args.scale]
+    args.users = args.users or users
+    args.movies = args.movies or movies
+    args.swipes = args.swipes or swipes
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix='movie-matcher-bench-')
+    db_path = os.path.abspath(args.db) if args.db else os.path.join(workdir, 'bench.db')
+    needs_data = not os.path.exists(db_path)
+
+    # The app reads its configuration at import time
+    stub, stub_url = start_omdb_stub()
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    os.environ['OMDB_BASE_URL'] = stub_url
+    os.environ['OMDB_API_KEY'] = 'benchmark'
+    os.environ['OMDB_CACHE_PATH'] = os.path.join(workdir, 'omdb_cache.db')
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    import app as app_module
+
+    if needs_data:
+        t0 = time.perf_counter()
+        summary = generate(app_module, args.users, args.movies, args.swipes, seed=args.seed)
+        print(f"Generated {summary} in {time.perf_counter() - t0:.1f}s at {db_path}")
+
+    try:
+        results = run_benchmarks(app_module, args, args.users)
+    finally:
+        stub.shutdown()
+        with app_module.app.app_context():
+            app_module.db.engine.dispose()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "config": {key: getattr(args, key) for key in ('scale', 'users', 'movies', 'swipes', 'requests', 'group_size', 'page_size', 'seed')},
+        "results": results,
+    }
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"Saved results to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.compare}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""Title normalization and FTS5 query building for local catalog search."""
+import re
+import unicodedata
+from difflib import SequenceMatcher
+
+_LEADING_ARTICLE = re.compile(r'^(the|a|an) ')
+_TRAILING_ARTICLE = re.compile(r',\s*(the|a|an)\s*$')
+_TOKEN = re.compile(r'\w+')
+
+# Column weights for bm25(): title, starring, genre, description
+BM25_WEIGHTS = (10.0, 2.0, 2.0, 1.0)
+# Leading letters a word must share with the query in fuzzy searches
+FUZZY_PREFIX = 3
+
+
+def normalize_title(title):
+    """Fold a title to a comparison key: "The Good, the Bad & the Ugly" -> "good the bad and the ugly".
+
+    Diacritics, punctuation and a leading article are dropped, and catalog
+    style "Matrix, The" folds to the same key as "The Matrix".
+    """
+    title = unicodedata.normalize('NFKD', title)
+    title = ''.join(ch for ch in title if not unicodedata.combining(ch)).lower().replace('&', ' and ')
+    title = _TRAILING_ARTICLE.sub('', title)
+    title = ' '.join(_TOKEN.findall(title.replace('_', ' ')))
+    return _LEADING_ARTICLE.sub('', title)
+
+
+def _tokens(text):
+    return _TOKEN.findall(normalize_title(text))
+
+
+def fts_query(text, column=None, fuzzy=False):
+    """Build an FTS5 MATCH expression for free text, or None if it has no searchable words.
+
+    Every word is quoted (so user input can't inject FTS syntax) and the last
+    one matches as a prefix, so results show up while a title is being typed.
+    With fuzzy=True any word may match and only its first few letters count,
+    which casts a wide net for typo-tolerant searches to re-rank.
+    """
+    tokens = _tokens(text)
+    if not tokens:
+        return None
+    if fuzzy:
+        expression = ' OR '.join(f'"{token[:FUZZY_PREFIX]}"*' for token in tokens)
+    else:
+        expression = ' '.join([f'"{token}"' for token in tokens[:-1]] + [f'"{tokens[-1]}"*'])
+    return f'{column} : ({expression})' if column else expression
+
+
+def title_similarity(a, b):
+    return SequenceMatcher(None, normalize_title(a), normalize_title(b)).ratio()
@@ -0,0 +1,130 @@
+import random
+import threading
+from array import array
+from collections import OrderedDict
+
+
+class _Deck:
+    __slots__ = ('order', 'members', 'high_water', 'discarded')
+
+    def __init__(self, order, high_water):
+        # Movie ids as 32-bit ints, plus one membership bit per movie id: about
+        # 4 bytes per card and 1/8 byte per catalog id, rather than two boxed
+        # ints in a list and a set
+        self.order = order
+        self.members = bytearray()
+        self.high_water = high_water
+        self.discarded = 0
+        for movie_id in order:
+            self.add(movie_id)
+
+    def __contains__(self, movie_id):
+        byte = movie_id >> 3
+        return byte < len(self.members) and bool(self.members[byte] & (1 << (movie_id & 7)))
+
+    def add(self, movie_id):
+        byte = movie_id >> 3
+        if byte >= len(self.members):
+            self.members.extend(bytes(byte - len(self.members) + 1))
+        self.members[byte] |= 1 << (movie_id & 7)
+
+    def remove(self, movie_id):
+        self.members[movie_id >> 3] &= ~(1 << (movie_id & 7)) & 0xFF
+
+
+class UnseenDeck:
+    """Per-user pre-shuffled queues of movie ids the user has not seen yet.
+
+    Each deck is a shuffled array (the top of the deck is the end of the
+    array) plus a membership bitmap. Marking a movie as seen only clears its
+    bit; the stale id is skipped the next time it reaches the top of the
+    deck, so both serving and swiping stay O(1) amortized.
+
+    Only the `max_users` most recently used decks are kept; an evicted deck
+    is simply rebuilt the next time its user asks for a card.
+    """
+
+    def __init__(self, max_users=256):
+        self.max_users = max_users
+        self._lock = threading.Lock()
+        self._decks = OrderedDict()
+
+    def _get(self, user_id):
+        deck = self._decks.get(user_id)
+        if deck is not None:
+            self._decks.move_to_end(user_id)
+        return deck
+
+    def has(self, user_id):
+        with self._lock:
+            return self._get(user_id) is not None
+
+    def high_water(self, user_id):
+        with self._lock:
+            deck = self._get(user_id)
+            return deck.high_water if deck is not None else 0
+
+    def load(self, user_id, movie_ids, high_water, shuffle=True):
+        """Replace the user's deck; with shuffle=False, `movie_ids` is served last to first."""
+        order = array('i', movie_ids)
+        if shuffle:
+            random.shuffle(order)
+        deck = _Deck(order, high_water)
+        with self._lock:
+            self._decks[user_id] = deck
+            self._decks.move_to_end(user_id)
+            while len(self._decks) > self.max_users:
+                self._decks.popitem(last=False)
+
+    def extend(self, user_id, movie_ids, high_water):
+        """Shuffle newly added movies into an existing deck."""
+        with self._lock:
+            deck = self._get(user_id)
+            if deck is None:
+                return
+            order = deck.order
+            for movie_id in movie_ids:
+                if movie_id in deck:
+                    continue
+                # Inside-out Fisher-Yates step: keeps the deck uniformly shuffled.
+                order.append(movie_id)
+                j = random.randrange(len(order))
+                order[-1], order[j] = order[j], order[-1]
+                deck.add(movie_id)
+            deck.high_water = max(deck.high_water, high_water)
+
+    def peek(self, user_id, count=1, allowed=None):
+        """Return up to `count` ids from the top of the deck without consuming them.
+
+        With `allowed`, cards not in it are passed over and stay in the deck.
+        """
+        with self._lock:
+            deck = self._get(user_id)
+            if deck is None:
+                return []
+            order = deck.order
+            while order and order[-1] not in deck:
+                order.pop()
+            result = []
+            i = len(order) - 1
+            while i >= 0 and len(result) < count:
+                if order[i] in deck and (allowed is None or order[i] in allowed):
+                    result.append(order[i])
+                i -= 1
+            return result
+
+    def discard(self, user_id, movie_ids):
+        with self._lock:
+            deck = self._decks.get(user_id)
+            if deck is None:
+                return
+            for movie_id in movie_ids:
+                if movie_id in deck:
+                    deck.remove(movie_id)
+                    deck.discarded += 1
+
+    def discarded(self, user_id):
+        """Number of cards swiped away since the deck was last loaded."""
+        with self._lock:
+            deck = self._decks.get(user_id)
+            return deck.discarded if deck is not None else 0
@@ -0,0 +1,142 @@
+"""Publish/subscribe behind the /api/events server-sent event stream.
+
+`EventBroker` fans events out to the subscribers connected to one process.
+With several workers, every event is also written to the event_log table in
+the transaction that caused it, and an `EventLogRelay` thread in each worker
+feeds new rows into that worker's broker, so all subscribers see the same
+events under the same ids.
+"""
+import json
+import logging
+import queue
+import threading
+from collections import deque, namedtuple
+
+Event = namedtuple('Event', 'id type data')
+
+
+class Subscription:
+    def __init__(self, size):
+        self._queue = queue.Queue(size)
+        # Set when the subscriber fell too far behind and was dropped
+        self.overflowed = False
+
+    def get(self, timeout):
+        """Return the next event, or None if none arrived within `timeout` seconds."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBroker:
+    """In-process fan-out with a short backlog for clients resuming via Last-Event-ID.
+
+    A subscriber whose queue fills up is dropped rather than slowing down
+    publishers; its stream ends, and the client reconnects and replays what
+    it missed from the backlog.
+    """
+
+    def __init__(self, backlog=1000, queue_size=256):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._backlog = deque(maxlen=backlog)
+        self.last_id = 0
+
+    def publish(self, event_type, data, event_id=None):
+        """Deliver an event to every subscriber; ids must increase, so older ids are ignored."""
+        with self._lock:
+            if event_id is None:
+                event_id = self.last_id + 1
+            elif event_id <= self.last_id:
+                return None
+            self.last_id = event_id
+            event = Event(event_id, event_type, data)
+            self._backlog.append(event)
+            for subscription in list(self._subscribers):
+                try:
+                    subscription._queue.put_nowait(event)
+                except queue.Full:
+                    subscription.overflowed = True
+                    self._subscribers.discard(subscription)
+        return event_id
+
+    def subscribe(self, last_event_id=None):
+        """Start receiving events, first replaying backlogged ones after `last_event_id`."""
+        with self._lock:
+            missed = [event for event in self._backlog if last_event_id is not None and event.id > last_event_id]
+            subscription = Subscription(self.queue_size + len(missed))
+            for event in missed:
+                subscription._queue.put_nowait(event)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+
+class EventLogRelay:
+    """Polls the event_log table and publishes new rows to a broker.
+
+    On start it also replays the last `backlog` rows, so a client that
+    reconnects to a different worker can still resume where it left off.
+    Rows older than `retention` seconds are pruned as it goes.
+    """
+
+    def __init__(self, engine, broker, interval=0.5, retention=3600, backlog=1000):
+        self.engine = engine
+        self.broker = broker
+        self.interval = interval
+        self.retention = retention
+        self.backlog = backlog
+        self.high_water = None
+        self._wake = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            with self.engine.connect() as conn:
+                last_id = conn.exec_driver_sql("SELECT COALESCE(MAX(id), 0) FROM event_log").scalar()
+            self.high_water = max(last_id - self.backlog, 0)
+            self.poll()
+            self._thread = threading.Thread(target=self._run, name='event-log-relay', daemon=True)
+            self._thread.start()
+
+    def notify(self):
+        """Poll now instead of at the next interval, e.g. right after this worker wrote an event."""
+        self._wake.set()
+
+    def poll(self):
+        with self.engine.connect() as conn:
+            rows = conn.exec_driver_sql(
+                "SELECT id, type, data FROM event_log WHERE id > ? ORDER BY id LIMIT 1000", (self.high_water,)
+            ).all()
+        for event_id, event_type, data in rows:
+            self.broker.publish(event_type, json.loads(data), event_id)
+            self.high_water = event_id
+        return len(rows)
+
+    def prune(self):
+        with self.engine.begin() as conn:
+            conn.exec_driver_sql(
+                "DELETE FROM event_log WHERE created_at < datetime('now', ?)", (f'-{int(self.retention)} seconds',)
+            )
+
+    def _run(self):
+        polls = 0
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                while self.poll() == 1000:
+                    pass
+                polls += 1
+                if polls % 1000 == 0:
+                    self.prune()
+            except Exception:
+                logging.exception("Relaying events from event_log failed")
@@ -0,0 +1,53 @@
+"""Flask JSON provider that encodes with orjson.
+
+orjson is optional: without it (or for values it can't encode, such as
+integers wider than 64 bits) encoding falls back to the stdlib provider, so
+output is the same either way apart from speed.
+"""
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the deployment
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+
+    def _options(self, pretty=False):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def _encode(self, obj, pretty=False):
+        """Return the encoded bytes, or None if orjson can't encode `obj`."""
+        if orjson is None:
+            return None
+        try:
+            # Flask's default hook covers the types orjson leaves to it
+            # (datetimes as HTTP dates, Decimal, __html__)
+            return orjson.dumps(obj, default=self.default, option=self._options(pretty))
+        except (orjson.JSONEncodeError, TypeError):
+            return None
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        encoded = self._encode(obj)
+        return super().dumps(obj) if encoded is None else encoded.decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        encoded = self._encode(obj, pretty)
+        if encoded is None:
+            return super().response(obj)
+        return self._app.response_class(encoded + b"\n", mimetype=self.mimetype)
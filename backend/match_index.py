@@ -0,0 +1,112 @@
+import threading
+
+
+def _iter_bits(bits):
+    """Yield the positions of the set bits in `bits`, lowest first."""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def bitmap(movie_ids):
+    """Build a bitmap with the bits of `movie_ids` set, e.g. to restrict matches to a filtered set."""
+    buf = bytearray()
+    for movie_id in movie_ids:
+        byte = movie_id >> 3
+        if byte >= len(buf):
+            buf.extend(bytes(byte - len(buf) + 1))
+        buf[byte] |= 1 << (movie_id & 7)
+    return int.from_bytes(buf, 'little')
+
+
+class MatchIndex:
+    """In-memory like bitmaps, one arbitrary-precision int per user.
+
+    Bit `n` of a user's bitmap is set when the user liked the movie with id `n`,
+    so group matching is a handful of big-int AND/OR operations rather than one
+    query per movie. `high_water` is the last user_likes rowid folded in; since
+    likes are never deleted, syncing only needs the rows above it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._likes = {}
+        self.high_water = 0
+
+    def load(self, rows, high_water):
+        """Replace the index with (user_id, movie_id) rows."""
+        per_user = {}
+        for user_id, movie_id in rows:
+            per_user.setdefault(user_id, []).append(movie_id)
+        with self._lock:
+            self._likes = {user_id: bitmap(movie_ids) for user_id, movie_ids in per_user.items()}
+            self.high_water = high_water
+
+    def add_likes(self, rows, high_water=None):
+        with self._lock:
+            for user_id, movie_id in rows:
+                self._likes[user_id] = self._likes.get(user_id, 0) | (1 << movie_id)
+            if high_water is not None:
+                self.high_water = max(self.high_water, high_water)
+
+    def likers(self, movie_id, user_ids):
+        """Return the ids in `user_ids` that liked `movie_id`."""
+        with self._lock:
+            return [user_id for user_id in user_ids if self._likes.get(user_id, 0) >> movie_id & 1]
+
+    def full_matches(self, user_ids, within=None):
+        """Return ids of movies liked by every user in `user_ids`, ascending.
+
+        `within`, a bitmap, restricts the result to the movies whose bits are set.
+        """
+        with self._lock:
+            bitmaps = [self._likes.get(user_id, 0) for user_id in user_ids]
+        if not bitmaps:
+            return []
+        bits = bitmaps[0] if within is None else bitmaps[0] & within
+        for bitmap in bitmaps[1:]:
+            bits &= bitmap
+        return list(_iter_bits(bits))
+
+    def ranked_matches(self, user_ids, min_likes, limit=None, within=None):
+        """Rank movies liked by at least `min_likes` of `user_ids`.
+
+        Like counts are accumulated across all movies at once in a bit-sliced
+        counter (slice `i` holds bit `i` of every movie's count), so the cost is
+        O(users * log(users)) big-int operations. Returns (movie_id, like_count)
+        pairs ordered by count descending, then movie id; `within` restricts
+        them as in full_matches.
+        """
+        with self._lock:
+            bitmaps = [self._likes.get(user_id, 0) for user_id in user_ids]
+
+        slices = []
+        for user_bitmap in bitmaps:
+            carry = user_bitmap
+            for i, counter in enumerate(slices):
+                if not carry:
+                    break
+                slices[i] = counter ^ carry
+                carry &= counter
+            if carry:
+                slices.append(carry)
+
+        universe = 0
+        for user_bitmap in bitmaps:
+            universe |= user_bitmap
+        if within is not None:
+            universe &= within
+
+        result = []
+        for like_count in range(len(bitmaps), max(min_likes, 1) - 1, -1):
+            bits = universe
+            for i, counter in enumerate(slices):
+                bits &= counter if like_count >> i & 1 else ~counter
+            if like_count >> len(slices):
+                bits = 0
+            for movie_id in _iter_bits(bits):
+                result.append((movie_id, like_count))
+                if limit is not None and len(result) >= limit:
+                    return result
+        return result
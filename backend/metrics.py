@@ -0,0 +1,85 @@
+import threading
+from collections import deque
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _summary(values):
+    values = sorted(values)
+    if not values:
+        return {}
+    return {
+        "mean": round(sum(values) / len(values), 3),
+        "p50": _percentile(values, 0.50),
+        "p95": _percentile(values, 0.95),
+        "p99": _percentile(values, 0.99),
+        "max": values[-1],
+    }
+
+
+class _RouteStats:
+    def __init__(self, window):
+        self.count = 0
+        self.errors = 0
+        self.latency_ms = deque(maxlen=window)
+        self.queries = deque(maxlen=window)
+        self.db_ms = deque(maxlen=window)
+        self.response_bytes = deque(maxlen=window)
+
+
+class RequestMetrics:
+    """Per-route request statistics over a sliding window of recent requests.
+
+    Percentiles are computed from the last `window` samples of each route when
+    a snapshot is taken, so recording a request is just a few deque appends.
+    """
+
+    def __init__(self, window=1000, slow_log_size=50):
+        self.window = window
+        self._lock = threading.Lock()
+        self._routes = {}
+        self._slow = deque(maxlen=slow_log_size)
+
+    def record(self, route, status, latency_ms, queries, db_ms, response_bytes=None):
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = _RouteStats(self.window)
+            stats.count += 1
+            if status >= 500:
+                stats.errors += 1
+            stats.latency_ms.append(round(latency_ms, 3))
+            stats.queries.append(queries)
+            stats.db_ms.append(round(db_ms, 3))
+            if response_bytes is not None:
+                stats.response_bytes.append(response_bytes)
+
+    def record_slow(self, entry):
+        with self._lock:
+            self._slow.append(entry)
+
+    def snapshot(self):
+        with self._lock:
+            routes = {
+                route: {
+                    "count": stats.count,
+                    "errors": stats.errors,
+                    "latency_ms": _summary(stats.latency_ms),
+                    "queries": _summary(stats.queries),
+                    "db_ms": _summary(stats.db_ms),
+                    "response_bytes": _summary(stats.response_bytes),
+                }
+                for route, stats in self._routes.items()
+            }
+            slow = list(self._slow)
+        return {"window": self.window, "routes": routes, "slow_requests": slow}
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+            self._slow.clear()
@@ -0,0 +1,113 @@
+"""Versioned schema migrations for the SQLite database.
+
+The schema version lives in SQLite's `PRAGMA user_version`. Every step is
+written to be idempotent, so it is safe to run against a database that was
+created by `db.create_all()` from the current models.
+"""
+from movie_metadata import link_movies, parse_rating, parse_runtime
+
+
+def _create_tables(conn, metadata):
+    metadata.create_all(conn)
+
+
+def _add_reverse_indexes(conn, metadata):
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_user_likes_movie_id_user_id ON user_likes (movie_id, user_id)"
+    )
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_user_seen_movies_movie_id_user_id ON user_seen_movies (movie_id, user_id)"
+    )
+
+
+def _add_seen_at(conn, metadata):
+    columns = [row[1] for row in conn.exec_driver_sql("PRAGMA table_info(user_seen_movies)")]
+    if 'seen_at' not in columns:
+        # SQLite can't add a column with a CURRENT_TIMESTAMP default, so rows
+        # swiped before this migration keep a NULL seen_at
+        conn.exec_driver_sql("ALTER TABLE user_seen_movies ADD COLUMN seen_at DATETIME")
+
+
+def _add_data_version(conn, metadata):
+    metadata.tables['data_version'].create(conn, checkfirst=True)
+
+
+def _add_movie_search_index(conn, metadata):
+    # External-content FTS5 index over the movie table, kept in sync by triggers
+    conn.exec_driver_sql(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS movie_fts USING fts5("
+        "title, starring, genre, description, "
+        "content='movie', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS movie_fts_insert AFTER INSERT ON movie BEGIN "
+        "INSERT INTO movie_fts (rowid, title, starring, genre, description) "
+        "VALUES (new.id, new.title, new.starring, new.genre, new.description); END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS movie_fts_delete AFTER DELETE ON movie BEGIN "
+        "INSERT INTO movie_fts (movie_fts, rowid, title, starring, genre, description) "
+        "VALUES ('delete', old.id, old.title, old.starring, old.genre, old.description); END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS movie_fts_update AFTER UPDATE ON movie BEGIN "
+        "INSERT INTO movie_fts (movie_fts, rowid, title, starring, genre, description) "
+        "VALUES ('delete', old.id, old.title, old.starring, old.genre, old.description); "
+        "INSERT INTO movie_fts (rowid, title, starring, genre, description) "
+        "VALUES (new.id, new.title, new.starring, new.genre, new.description); END"
+    )
+    conn.exec_driver_sql("INSERT INTO movie_fts (movie_fts) VALUES ('rebuild')")
+
+
+def _add_movie_metadata(conn, metadata):
+    for name in ('genre', 'person', 'movie_genre', 'movie_cast'):
+        metadata.tables[name].create(conn, checkfirst=True)
+    columns = [row[1] for row in conn.exec_driver_sql("PRAGMA table_info(movie)")]
+    if 'rating_value' not in columns:
+        conn.exec_driver_sql("ALTER TABLE movie ADD COLUMN rating_value FLOAT")
+    if 'runtime_minutes' not in columns:
+        conn.exec_driver_sql("ALTER TABLE movie ADD COLUMN runtime_minutes INTEGER")
+    for column in ('year', 'rating_value', 'runtime_minutes'):
+        conn.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS ix_movie_{column} ON movie ({column})")
+
+    movies = conn.exec_driver_sql("SELECT id, genre, starring, rating, length FROM movie").all()
+    if movies:
+        conn.exec_driver_sql(
+            "UPDATE movie SET rating_value = ?, runtime_minutes = ? WHERE id = ?",
+            [(parse_rating(rating), parse_runtime(length), movie_id) for movie_id, _, _, rating, length in movies]
+        )
+        link_movies(conn, metadata, [(movie_id, genre, starring) for movie_id, genre, starring, _, _ in movies])
+
+
+def _add_event_log(conn, metadata):
+    metadata.tables['event_log'].create(conn, checkfirst=True)
+
+
+MIGRATIONS = [
+    (1, "Create tables", _create_tables),
+    (2, "Index user_likes and user_seen_movies by (movie_id, user_id)", _add_reverse_indexes),
+    (3, "Record when each movie was seen", _add_seen_at),
+    (4, "Add data_version counters for response caching", _add_data_version),
+    (5, "Add full-text search index over movies", _add_movie_search_index),
+    (6, "Split genres and cast into indexed tables; store rating and runtime as numbers", _add_movie_metadata),
+    (7, "Add event_log for relaying live events between workers", _add_event_log),
+]
+
+
+def current_version(engine):
+    with engine.connect() as conn:
+        return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def upgrade(engine, metadata):
+    """Apply pending migrations in order; returns the (version, description) pairs applied."""
+    applied = []
+    version = current_version(engine)
+    for number, description, migrate in MIGRATIONS:
+        if number <= version:
+            continue
+        with engine.begin() as conn:
+            migrate(conn, metadata)
+            conn.exec_driver_sql(f"PRAGMA user_version = {number}")
+        applied.append((number, description))
+    return applied
@@ -0,0 +1,72 @@
+"""Parsing of OMDb's free-text movie fields into normalized, indexable values."""
+import re
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+_RUNTIME = re.compile(r'(?:(\d+)\s*h(?:ours?|rs?)?)?\s*(?:(\d+)\s*min)?', re.IGNORECASE)
+
+
+def split_names(value):
+    """Split OMDb's "Comedy, Drama" style lists into distinct names, dropping "N/A"."""
+    names = {}
+    for name in (value or '').split(','):
+        name = ' '.join(name.split())
+        if name and name.upper() != 'N/A':
+            names.setdefault(name.lower(), name)
+    return list(names.values())
+
+
+def parse_rating(value):
+    """"7.9" -> 7.9; None for "N/A" or anything else that isn't a number."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_runtime(value):
+    """"142 min" (or "2 h 22 min") -> 142; None if there's no runtime."""
+    match = _RUNTIME.search(value or '')
+    hours, minutes = match.groups() if match else (None, None)
+    if hours is None and minutes is None:
+        return None
+    return int(hours or 0) * 60 + int(minutes or 0)
+
+
+def _name_ids(conn, table, names):
+    """Return {lowercased name: id} for `names`, inserting the ones `table` doesn't have yet."""
+    if not names:
+        return {}
+    conn.execute(sqlite_insert(table).on_conflict_do_nothing(), [{"name": name} for name in names])
+    ids = {}
+    for start in range(0, len(names), 500):
+        chunk = names[start:start + 500]
+        for name_id, name in conn.execute(select(table.c.id, table.c.name).where(table.c.name.in_(chunk))):
+            ids[name.lower()] = name_id
+    return ids
+
+
+def link_movies(conn, metadata, movies):
+    """Fill the genre/person tables and their movie links from (movie_id, genre, starring) rows.
+
+    `conn` is a Connection or Session; the caller commits. Links that already
+    exist are left alone, so re-running over the same movies is harmless.
+    """
+    movies = [(movie_id, split_names(genre), split_names(starring)) for movie_id, genre, starring in movies]
+    for names_table, link_table, column, position in (
+        ('genre', 'movie_genre', 'genre_id', 1),
+        ('person', 'movie_cast', 'person_id', 2),
+    ):
+        names = {}
+        for movie in movies:
+            for name in movie[position]:
+                names.setdefault(name.lower(), name)
+        names = list(names.values())
+        ids = _name_ids(conn, metadata.tables[names_table], names)
+        links = [
+            {"movie_id": movie[0], column: ids[name.lower()]}
+            for movie in movies for name in movie[position]
+        ]
+        if links:
+            conn.execute(sqlite_insert(metadata.tables[link_table]).on_conflict_do_nothing(), links)
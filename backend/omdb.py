@@ -0,0 +1,116 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+_YEAR_SUFFIX = re.compile(r'^(.*?)\s*\((\d{4})\)$')
+
+
+def parse_query(query):
+    """Split "Title (1999)" into ("Title", "1999"); the year is optional."""
+    query = ' '.join(query.split())
+    match = _YEAR_SUFFIX.match(query)
+    if match:
+        return match.group(1), match.group(2)
+    return query, None
+
+
+def cache_key(title, year=None):
+    key = ' '.join(title.lower().split())
+    return f"{key}|{year}" if year else key
+
+
+class OmdbCache:
+    """Persistent TTL cache of OMDb responses, stored in a small SQLite file.
+
+    Negative results ("Movie not found!") are cached too, with their own TTL,
+    so repeat bulk searches don't spend API quota on titles OMDb doesn't know.
+    """
+
+    def __init__(self, path, ttl, negative_ttl):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS omdb_cache "
+            "(key TEXT PRIMARY KEY, payload TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM omdb_cache WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, payload):
+        ttl = self.ttl if payload.get('Response') == 'True' else self.negative_ttl
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO omdb_cache (key, payload, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(payload), time.time() + ttl)
+            )
+            self._conn.commit()
+
+
+class OmdbClient:
+    """Looks titles up on OMDb over a pooled session, with bounded concurrency."""
+
+    def __init__(self, api_key, base_url, cache=None, timeout=10, max_workers=8):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.cache = cache
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def lookup(self, title, year=None):
+        """Return OMDb's payload for a title; failures come back as OMDb-style errors."""
+        key = cache_key(title, year)
+        if self.cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        params = {'apikey': self.api_key, 't': title}
+        if year:
+            params['y'] = year
+        try:
+            response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+            response.raise_for_status()
+            payload = response.json()
+        except (requests.RequestException, ValueError) as e:
+            # Transport errors are not cached; the next search retries them
+            return {"Response": "False", "Error": f"OMDb request failed: {e}"}
+
+        if self.cache and (payload.get('Response') == 'True' or 'not found' in payload.get('Error', '').lower()):
+            self.cache.set(key, payload)
+        return payload
+
+    def lookup_many(self, queries):
+        """Look up `queries` concurrently; results are returned in input order.
+
+        Each result is the OMDb payload with the original query under "query".
+        Duplicate titles in the same batch are only fetched once.
+        """
+        parsed = [parse_query(query) for query in queries]
+        unique = list(dict.fromkeys(cache_key(title, year) for title, year in parsed))
+        by_key = dict(zip((cache_key(title, year) for title, year in parsed), parsed))
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(unique) or 1)) as pool:
+            payloads = dict(zip(unique, pool.map(lambda key: self.lookup(*by_key[key]), unique)))
+
+        return [
+            dict(payloads[cache_key(title, year)], query=query)
+            for query, (title, year) in zip(queries, parsed)
+        ]
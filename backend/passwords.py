@@ -0,0 +1,64 @@
+"""Password hashing on a process pool.
+
+Werkzeug's hashes are deliberately slow. Running them in worker processes
+keeps a signup burst from tying up the GIL and the request threads, and
+lets bulk imports hash on every core at once.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+def _check(pair):
+    password_hash, password = pair
+    return check_password_hash(password_hash, password)
+
+
+class PasswordHasher:
+    """Hash and check passwords on a lazily started process pool.
+
+    With max_workers=0 everything runs inline in the calling thread.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _pool(self):
+        if self.max_workers == 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                # "spawn": forking a multi-threaded server can copy locks held by other threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+    def hash(self, password):
+        pool = self._pool()
+        if pool is None:
+            return generate_password_hash(password)
+        return pool.submit(generate_password_hash, password).result()
+
+    def check(self, password_hash, password):
+        pool = self._pool()
+        if pool is None:
+            return check_password_hash(password_hash, password)
+        return pool.submit(check_password_hash, password_hash, password).result()
+
+    def hash_many(self, passwords):
+        pool = self._pool()
+        if pool is None:
+            return [generate_password_hash(password) for password in passwords]
+        return list(pool.map(generate_password_hash, passwords))
+
+    def check_many(self, pairs):
+        """Check (password_hash, password) pairs; returns a list of booleans."""
+        pool = self._pool()
+        if pool is None:
+            return [_check(pair) for pair in pairs]
+        return list(pool.map(_check, pairs))
@@ -0,0 +1,153 @@
+"""Consistent NDJSON snapshots of the catalog, users and swipes.
+
+A snapshot is one JSON object per line: a header, then for each table a
+{"table", "columns"} line followed by one JSON array per row (in rowid order,
+so swipe order survives a round trip), then {"end": true, "rows": {...}}.
+"""
+import json
+import os
+import sqlite3
+
+FORMAT = 'movie-matcher-snapshot'
+FORMAT_VERSION = 1
+
+# In dependency order, so rows only ever reference rows imported before them.
+# The FTS index is rebuilt by triggers; data versions and events are per deployment.
+TABLES = ('user', 'movie', 'genre', 'person', 'movie_genre', 'movie_cast', 'user_likes', 'user_seen_movies')
+
+
+def backup(source, dest_path):
+    """Copy a live SQLite database (a sqlite3 connection) to `dest_path` with the online backup API.
+
+    The copy is made in a single step. Under WAL that only holds a read
+    snapshot, so writers carry on and the copy is consistent as of the start.
+    """
+    dest = sqlite3.connect(dest_path)
+    try:
+        source.backup(dest)
+    finally:
+        dest.close()
+
+
+def iter_ndjson(path, batch_size=1000, tables=TABLES):
+    """Yield the database at `path` as NDJSON chunks, reading `batch_size` rows at a time."""
+    conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        schema_version = conn.execute("PRAGMA user_version").fetchone()[0]
+        yield json.dumps({"format": FORMAT, "version": FORMAT_VERSION, "schema_version": schema_version}) + '\n'
+        existing = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        counts = {}
+        for table in tables:
+            if table not in existing:
+                continue
+            cursor = conn.execute(f'SELECT * FROM "{table}" ORDER BY rowid')
+            yield json.dumps({"table": table, "columns": [column[0] for column in cursor.description]}) + '\n'
+            counts[table] = 0
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield ''.join(json.dumps(row, separators=(',', ':'), default=str) + '\n' for row in rows)
+                counts[table] += len(rows)
+        yield json.dumps({"end": True, "rows": counts}) + '\n'
+    finally:
+        conn.close()
+
+
+class SnapshotImporter:
+    """Load a snapshot into an empty database in batches, one short transaction per batch.
+
+    Rows keep their ids, so the target must not hold data of its own: a user
+    or movie skipped for a taken id would leave its swipes pointing at someone
+    else's row. After every batch the number of lines consumed is saved to
+    `checkpoint_path`, and an interrupted import picks up where it stopped
+    when run again (rows it already wrote are skipped). Columns the target
+    table doesn't have are dropped; missing ones get their defaults.
+    """
+
+    def __init__(self, engine, checkpoint_path=None, batch_size=1000):
+        self.engine = engine
+        self.checkpoint_path = checkpoint_path
+        self.batch_size = batch_size
+
+    def _load_checkpoint(self):
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return 0, {}
+        with open(self.checkpoint_path, encoding='utf-8') as f:
+            checkpoint = json.load(f)
+        return checkpoint['line'], checkpoint['inserted']
+
+    def _save_checkpoint(self, line, inserted):
+        if not self.checkpoint_path:
+            return
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"line": line, "inserted": inserted}, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _has_data(self):
+        with self.engine.connect() as conn:
+            existing = {name for (name,) in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            return any(
+                conn.exec_driver_sql(f'SELECT 1 FROM "{table}" LIMIT 1').first() is not None
+                for table in TABLES if table in existing
+            )
+
+    def _target_columns(self, table):
+        with self.engine.connect() as conn:
+            return {row[1] for row in conn.exec_driver_sql(f'PRAGMA table_info("{table}")')}
+
+    def run(self, lines):
+        """Import NDJSON `lines`; returns {table: rows inserted}, including earlier runs."""
+        resume_line, inserted = self._load_checkpoint()
+        if resume_line == 0 and self._has_data():
+            raise ValueError("The database already has users, movies or swipes; import into an empty database")
+        table = statement = None
+        keep = []
+        batch = []
+        line_number = 0
+
+        def flush():
+            if batch:
+                with self.engine.begin() as conn:
+                    result = conn.exec_driver_sql(statement, batch)
+                    inserted[table] = inserted.get(table, 0) + max(result.rowcount, 0)
+                batch.clear()
+            if line_number > resume_line:
+                self._save_checkpoint(line_number, inserted)
+
+        for line_number, line in enumerate(lines, 1):
+            line = line.strip()
+            if line_number == 1:
+                header = json.loads(line) if line.startswith('{') else None
+                if not isinstance(header, dict) or header.get('format') != FORMAT:
+                    raise ValueError("Not a snapshot file")
+                continue
+            if not line:
+                continue
+            if line.startswith('{'):
+                item = json.loads(line)
+                if 'table' in item:
+                    flush()
+                    table = item['table']
+                    # Table names end up in SQL, so only the known ones are accepted
+                    target = self._target_columns(table) if table in TABLES else set()
+                    keep = [i for i, column in enumerate(item['columns']) if column in target]
+                    columns = ', '.join(f'"{item["columns"][i]}"' for i in keep)
+                    placeholders = ', '.join('?' for _ in keep)
+                    statement = (
+                        f'INSERT INTO "{table}" ({columns}) VALUES ({placeholders}) ON CONFLICT DO NOTHING'
+                        if target else None
+                    )
+                continue
+            if line_number <= resume_line or statement is None:
+                continue
+            row = json.loads(line)
+            batch.append(tuple(row[i] for i in keep))
+            if len(batch) >= self.batch_size:
+                flush()
+        flush()
+
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        return inserted
@@ -0,0 +1,58 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+# What request handlers need to know about the authenticated user
+UserRef = namedtuple('UserRef', ['id', 'username'])
+
+
+class UserCache:
+    """Small LRU cache of UserRef entries with a time-to-live."""
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            user, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return user
+
+    def get_many(self, user_ids):
+        """Return ({user_id: UserRef} for cached ids, [ids that missed])."""
+        found, missing = {}, []
+        for user_id in user_ids:
+            user = self.get(user_id)
+            if user is None:
+                missing.append(user_id)
+            else:
+                found[user_id] = user
+        return found, missing
+
+    def put(self, user):
+        ref = UserRef(user.id, user.username)
+        with self._lock:
+            self._entries[ref.id] = (ref, time.monotonic() + self.ttl)
+            self._entries.move_to_end(ref.id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return ref
+
+    def preload(self, users):
+        return {user.id: self.put(user) for user in users}
+
+    def invalidate(self, user_id=None):
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
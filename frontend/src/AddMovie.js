@@ -22,7 +22,11 @@ const AddMovie = () => {
       const response = await axios.get(`${API_URL}/api/movies/search?query=${encodeURIComponent(query)}`, {
         headers: { Authorization: `Bearer ${token}` }
       });
-      setMovies(response.data);
+      setMovies(response.data.filter(movie => movie.Response === 'True'));
+      const notFound = response.data.filter(movie => movie.Response !== 'True');
+      if (notFound.length > 0) {
+        setError(`Not found: ${notFound.map(movie => `${movie.query} (${movie.Error})`).join('; ')}`);
+      }
     } catch (error) {
       console.error('Error searching movies:', error);
       setError('Movie not found.');
@@ -67,14 +71,16 @@ const AddMovie = () => {
       {error && <div className="error">{error}</div>}
 
       {movies.map((movie) => (
-        <div key={movie.imdbID} className="movie-details">
+        <div key={movie.imdbID || movie.query} className="movie-details">
           <img src={movie.Poster} alt={movie.Title} />
           <h3>{movie.Title}</h3>
           <p><strong>Year:</strong> {movie.Year}</p>
           <p><strong>Director:</strong> {movie.Director}</p>
           <p><strong>Genre:</strong> {movie.Genre}</p>
           <p><strong>Plot:</strong> {movie.Plot}</p>
-          {addSuccess[movie.imdbID] ? (
+          {movie.InCatalog ? (
+            <div className="success">Already in catalog</div>
+          ) : addSuccess[movie.imdbID] ? (
             <div className="success">Added successfully!</div>
           ) : (
             <button onClick={() => addMovie(movie)}>Add to Database</button>
@@ -2,6 +2,8 @@ import React, { useState, useEffect } from 'react';
 import axios from 'axios';
 import './AllMovies.css';
 
+const MOVIE_FIELDS = 'title,year,genre,rating,added_by,unseen_by';
+
 const AllMovies = () => {
   const [movies, setMovies] = useState([]);
   const [loading, setLoading] = useState(true);
@@ -12,12 +14,41 @@ const AllMovies = () => {
     fetchAllMovies();
   }, []);
 
+  // Apply catalog and swipe changes as they happen instead of re-downloading everything
+  useEffect(() => {
+    const token = localStorage.getItem('token');
+    const events = new EventSource(`${apiUrl}/api/events?jwt=${encodeURIComponent(token)}`);
+    events.addEventListener('movie_added', async (e) => {
+      const { id } = JSON.parse(e.data);
+      try {
+        const response = await axios.get(`${apiUrl}/api/movies/all`, {
+          params: { after: id - 1, limit: 1, fields: MOVIE_FIELDS },
+          headers: { Authorization: `Bearer ${token}` }
+        });
+        const added = response.data.filter(movie => movie.id === id);
+        setMovies(prev => (prev.some(movie => movie.id === id) ? prev : [...prev, ...added]));
+      } catch (error) {
+        console.error('Error fetching added movie:', error);
+      }
+    });
+    events.addEventListener('swipe', (e) => {
+      const { user_id, movie_id } = JSON.parse(e.data);
+      setMovies(prev => prev.map(movie => (
+        movie.id === movie_id
+          ? { ...movie, unseen_by: movie.unseen_by.filter(user => user.id !== user_id) }
+          : movie
+      )));
+    });
+    return () => events.close();
+  }, [apiUrl]);
+
   const fetchAllMovies = async () => {
     setLoading(true);
     setError(null);
     try {
       const token = localStorage.getItem('token');
       const response = await axios.get(`${apiUrl}/api/movies/all`, {
+        params: { fields: MOVIE_FIELDS },
         headers: { Authorization: `Bearer ${token}` }
       });
       setMovies(response.data);
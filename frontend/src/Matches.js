@@ -6,6 +6,7 @@ const Matches = () => {
   const [users, setUsers] = useState([]);
   const [selectedUsers, setSelectedUsers] = useState([]);
   const [matches, setMatches] = useState([]);
+  const [matchedGroup, setMatchedGroup] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const apiUrl = process.env.REACT_APP_API_URL || 'http://localhost:5000';
@@ -14,6 +15,22 @@ const Matches = () => {
     fetchUsers();
   }, []);
 
+  // Add new group matches as they happen instead of re-running the query
+  useEffect(() => {
+    if (!matchedGroup) {
+      return undefined;
+    }
+    const token = localStorage.getItem('token');
+    const events = new EventSource(
+      `${apiUrl}/api/events?jwt=${encodeURIComponent(token)}&userIds=${matchedGroup.join(',')}`
+    );
+    events.addEventListener('match', (e) => {
+      const { movie } = JSON.parse(e.data);
+      setMatches(prev => (prev.some(match => match.id === movie.id) ? prev : [movie, ...prev]));
+    });
+    return () => events.close();
+  }, [matchedGroup, apiUrl]);
+
   const fetchUsers = async () => {
     setLoading(true);
     setError(null);
@@ -52,11 +69,13 @@ const Matches = () => {
     try {
       const token = localStorage.getItem('token');
       const response = await axios.post(`${apiUrl}/api/movies/matches`, {
-        userIds: selectedUsers
+        userIds: selectedUsers,
+        fields: ['title', 'poster', 'genre', 'rating', 'matched_users']
       }, {
         headers: { Authorization: `Bearer ${token}` }
       });
       setMatches(response.data);
+      setMatchedGroup([...selectedUsers]);
     } catch (error) {
       console.error('Error fetching matches:', error);
       setError('Failed to fetch matches. Please try again.');
@@ -15,11 +15,53 @@ const MovieSwiper = () => {
 
 
   useEffect(() => {
-    fetchMovie();
-    fetchDebugInfo();
-    fetchUserInfo();
+    fetchInitialData();
   }, []);
 
+  // One round trip for everything the view needs on mount
+  const fetchInitialData = async () => {
+    setLoading(true);
+    setError(null);
+    setAllDone(false);
+    try {
+      const token = localStorage.getItem('token');
+      const response = await axios.post(`${apiUrl}/api/batch`, {
+        requests: [
+          { method: 'GET', path: '/api/movies/random' },
+          { method: 'GET', path: '/api/debug/movie-counts' },
+          { method: 'GET', path: '/api/user/info' }
+        ]
+      }, {
+        headers: { Authorization: `Bearer ${token}` }
+      });
+      const [movie, counts, userInfo] = response.data.responses;
+      if (movie.status === 200) {
+        setCurrentMovie(movie.body);
+      } else if (movie.status === 404) {
+        setAllDone(true);
+      } else {
+        setError(`Server error: ${movie.status} - ${(movie.body && movie.body.message) || 'Unknown error'}`);
+      }
+      if (counts.status === 200) {
+        setDebugInfo(counts.body);
+      }
+      if (userInfo.status === 200) {
+        setUsername(userInfo.body.username);
+      }
+    } catch (error) {
+      console.error('Error loading initial data:', error);
+      if (error.response) {
+        setError(`Server error: ${error.response.status} - ${error.response.data.message || 'Unknown error'}`);
+      } else if (error.request) {
+        setError('No response received from server. Please check your connection.');
+      } else {
+        setError(`Error: ${error.message}`);
+      }
+    } finally {
+      setLoading(false);
+    }
+  };
+
   const fetchMovie = async () => {
     setLoading(true);
     setError(null);
@@ -60,18 +102,6 @@ const MovieSwiper = () => {
     }
   };
 
-  const fetchUserInfo = async () => {
-    try {
-      const token = localStorage.getItem('token');
-      const response = await axios.get(`${apiUrl}/api/user/info`, {
-        headers: { Authorization: `Bearer ${token}` }
-      });
-      setUsername(response.data.username);
-    } catch (error) {
-      console.error('Error fetching user info:', error);
-    }
-  };
-
   const fetchMovieHistory = async () => {
     try {
       const token = localStorage.getItem('token');